@@ -0,0 +1,19 @@
+"""
+Optional Numba support.
+
+``njit`` compiles the decorated function when Numba is installed and returns
+it unchanged otherwise. Callers check ``NUMBA_AVAILABLE`` to pick between a
+loop kernel and a vectorized NumPy fallback.
+"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -1,64 +1,327 @@
+import os
+import atexit
+import asyncio
+import threading
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from scipy.signal import argrelextrema
+from collections import OrderedDict
+from datetime import datetime, date, time, timedelta
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
 from sklearn.preprocessing import MinMaxScaler
-from candlestick_patterns import detect_candlestick_patterns, get_pattern_description
+from candlestick_patterns import CandlestickPatternDetector, get_pattern_description
+from _njit import njit, NUMBA_AVAILABLE
+
+# Upper bound on historical-data requests in flight at once
+MAX_CONCURRENT_FETCHES = 50
+
+# Seconds a fetched history window is reused; today's bar keeps changing during the session
+HISTORY_CACHE_TTL = 300
+HISTORY_CACHE_SIZE = 4096
+
+# Substrings that mark a candlestick pattern as bullish or bearish
+BULLISH_KEYWORDS = frozenset([
+    'bullish', 'hammer', 'inverted hammer', 'morning star', 'three white soldiers',
+    'piercing', 'bullish engulfing', 'bullish harami', 'three inside up', 'three outside up'
+])
+BEARISH_KEYWORDS = frozenset([
+    'bearish', 'hanging man', 'shooting star', 'evening star', 'three black crows',
+    'dark cloud cover', 'bearish engulfing', 'bearish harami', 'three inside down', 'three outside down'
+])
+
+# Column dtypes for parsed historical data. Prices only need float32
+# precision and volume is an integer count.
+SCHEMA = {
+    'open': 'f4',
+    'high': 'f4',
+    'low': 'f4',
+    'close': 'f4',
+    'volume': 'i8',
+    'datetime': 'M8[s]'
+}
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _volume_profile_kernel(close, vol, low_min, inv_bin, nbins):
+        """Sum volume into price bins by close."""
+        volumes = np.zeros(nbins)
+        for i in range(close.shape[0]):
+            idx = int((close[i] - low_min) * inv_bin)
+            if idx < 0:
+                idx = 0
+            elif idx >= nbins:
+                idx = nbins - 1
+            volumes[idx] += vol[i]
+        return volumes
+
+    @njit(cache=True, nogil=True)
+    def _find_extrema(arr, window, greater):
+        """Indices that are the max (or min) of their +/- window neighbourhood."""
+        n = arr.shape[0]
+        out = np.empty(n, dtype=np.int64)
+        count = 0
+        for i in range(n):
+            is_extremum = True
+            for j in range(max(0, i - window), min(n, i + window + 1)):
+                if (arr[j] > arr[i]) if greater else (arr[j] < arr[i]):
+                    is_extremum = False
+                    break
+            if is_extremum:
+                out[count] = i
+                count += 1
+        return out[:count]
+
+    def _readonly_zeros(dtype):
+        """One-element array flagged read-only like the cached columns."""
+        arr = np.zeros(1, dtype)
+        arr.flags.writeable = False
+        return arr
+
+    # Compile for the cached columns at import so the first scan doesn't pay for it.
+    # Numba types read-only arrays separately, so the dummies must be read-only too.
+    _volume_profile_kernel(_readonly_zeros(np.float32), _readonly_zeros(np.int64), np.float32(0), np.float32(1), 50)
+    _find_extrema(_readonly_zeros(np.float32), 5, True)
+else:
+    def _volume_profile_kernel(close, vol, low_min, inv_bin, nbins):
+        """Sum volume into price bins by close."""
+        idx = np.clip(((close - low_min) * inv_bin).astype(np.int32), 0, nbins - 1)
+        return np.bincount(idx, weights=vol, minlength=nbins)
+
+    def _find_extrema(arr, window, greater):
+        """Indices that are the max (or min) of their +/- window neighbourhood."""
+        extreme_filter = maximum_filter1d if greater else minimum_filter1d
+        return np.flatnonzero(arr == extreme_filter(arr, size=2 * window + 1, mode='nearest'))
 
 def get_historical_data(alice, token, from_date, to_date, interval="D", exchange='NSE'):
-    """Fetch historical data and return as a DataFrame."""
+    """Fetch historical data and return it as a dict of OHLCV column arrays."""
     exchange_name = 'BSE (1)' if exchange == 'BSE' else 'NSE'
-    instrument = alice.get_instrument_by_token(exchange_name, token)
+    instrument = _get_instrument(alice, exchange_name, token)
     historical_data = alice.get_historical(instrument, from_date, to_date, interval)
-    df = pd.DataFrame(historical_data).dropna()
-    return instrument, df
 
-def identify_candlestick_patterns(df):
+    # Integer columns can't hold NaN, so parse them as float until missing rows are dropped
+    raw = {}
+    for k, dtype in SCHEMA.items():
+        parse_dtype = 'f8' if np.dtype(dtype).kind == 'i' else dtype
+        raw[k] = _parse_column(historical_data, k, parse_dtype)
+
+    missing = np.zeros(len(raw['close']), dtype=bool)
+    for arr in raw.values():
+        missing |= np.isnat(arr) if arr.dtype.kind == 'M' else np.isnan(arr)
+    if missing.any():
+        raw = {k: arr[~missing] for k, arr in raw.items()}
+    cols = {k: np.ascontiguousarray(raw[k], dtype=dtype) for k, dtype in SCHEMA.items()}
+    assert cols['close'].flags.c_contiguous
+    return instrument, cols
+
+def _parse_column(historical_data, key, dtype):
+    """Parse one column of a get_historical response (DataFrame or list of records)."""
+    if np.dtype(dtype).kind == 'M':
+        # The API's timestamp format isn't guaranteed to be ISO 8601, so let pandas infer it
+        if isinstance(historical_data, pd.DataFrame):
+            values = historical_data[key]
+        else:
+            values = [r[key] for r in historical_data]
+        return pd.to_datetime(values).to_numpy(dtype=dtype)
+    if isinstance(historical_data, pd.DataFrame):
+        return historical_data[key].to_numpy(dtype=dtype)
+    return np.fromiter((r[key] for r in historical_data), dtype=dtype, count=len(historical_data))
+
+# (exchange_name, token) -> instrument; the contract master doesn't change within a process
+_INSTRUMENT_CACHE = {}
+
+def _get_instrument(alice, exchange_name, token):
+    """Resolve a token to its instrument; pya3 re-reads the contract CSV on every lookup."""
+    key = (exchange_name, token)
+    instrument = _INSTRUMENT_CACHE.get(key)
+    if instrument is None:
+        instrument = alice.get_instrument_by_token(exchange_name, token)
+        # pya3 reports a failed lookup as an error dict; leave it uncached so it's retried
+        if instrument is not None and not isinstance(instrument, dict):
+            _INSTRUMENT_CACHE[key] = instrument
+    return instrument
+
+# (exchange, token, from_iso, to_iso, interval) -> (fetch time, (instrument, cols)),
+# least recently used first. Keyed without the client, which the app recreates per rerun.
+_HISTORY_CACHE = OrderedDict()
+_HISTORY_CACHE_LOCK = threading.Lock()
+
+def _fetch_cached(alice, token, from_iso, to_iso, interval, exchange):
+    """Fetch the bars between two ISO dates, reusing a fetch younger than HISTORY_CACHE_TTL.
+
+    The arrays are shared between callers, so read-only. Empty responses aren't cached.
+    """
+    key = (exchange, token, from_iso, to_iso, interval)
+    with _HISTORY_CACHE_LOCK:
+        entry = _HISTORY_CACHE.get(key)
+        if entry is not None and monotonic() - entry[0] < HISTORY_CACHE_TTL:
+            _HISTORY_CACHE.move_to_end(key)
+            return entry[1]
+
+    fetched_at = monotonic()
+    from_date = datetime.combine(date.fromisoformat(from_iso), time.min)
+    to_date = min(datetime.combine(date.fromisoformat(to_iso), time.max), datetime.now())
+    instrument, cols = get_historical_data(alice, token, from_date, to_date, interval, exchange)
+    for arr in cols.values():
+        arr.flags.writeable = False
+    if len(cols['close']):
+        with _HISTORY_CACHE_LOCK:
+            _HISTORY_CACHE[key] = (fetched_at, (instrument, cols))
+            _HISTORY_CACHE.move_to_end(key)
+            if len(_HISTORY_CACHE) > HISTORY_CACHE_SIZE:
+                _HISTORY_CACHE.popitem(last=False)
+    return instrument, cols
+
+def get_cached_historical_data(alice, token, lookback_days, interval="D", exchange='NSE'):
+    """Fetch the last ``lookback_days`` of data, reusing a recent fetch of the same window."""
+    today = date.today()
+    from_iso = (today - timedelta(days=lookback_days)).isoformat()
+    return _fetch_cached(alice, token, from_iso, today.isoformat(), interval, exchange)
+
+def clear_cache():
+    """Clear the historical data and instrument caches."""
+    with _HISTORY_CACHE_LOCK:
+        _HISTORY_CACHE.clear()
+    _INSTRUMENT_CACHE.clear()
+
+_IO_EXECUTOR = None
+_CPU_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def _io_pool():
+    """Shared executor for the blocking historical-data requests."""
+    global _IO_EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _IO_EXECUTOR is None:
+            _IO_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES, thread_name_prefix='ta-io')
+    return _IO_EXECUTOR
+
+def _cpu_pool():
+    """Shared executor for the numeric analysis."""
+    global _CPU_EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _CPU_EXECUTOR is None:
+            _CPU_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='ta-cpu')
+    return _CPU_EXECUTOR
+
+@atexit.register
+def _shutdown_pools():
+    for executor in (_IO_EXECUTOR, _CPU_EXECUTOR):
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+def _fetch_or_none(alice, token, lookback_days, exchange='NSE'):
+    """Fetch daily history for a token, or None if the request fails."""
+    try:
+        return get_cached_historical_data(alice, token, lookback_days, "D", exchange)
+    except Exception as e:
+        print(f"Error fetching {token}: {e}")
+        return None
+
+async def aget_historical(alice, token, lookback_days, exchange='NSE', executor=None):
+    """Fetch daily history without blocking the event loop, or None if the request fails.
+
+    The pya3 client is synchronous, so the request runs on ``executor``.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, _fetch_or_none, alice, token, lookback_days, exchange
+    )
+
+async def get_historical_many_async(alice, tokens, lookback_days, exchange='NSE'):
+    """Fetch daily history for many tokens; returns (instrument, cols) for the ones that succeed.
+
+    AliceBlue has no multi-token history endpoint, so this issues one
+    request per token, at most MAX_CONCURRENT_FETCHES at a time.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    async def fetch_token(token):
+        async with semaphore:
+            return await aget_historical(alice, token, lookback_days, exchange, _io_pool())
+
+    fetched = await asyncio.gather(*(fetch_token(token) for token in tokens))
+    return [f for f in fetched if f is not None]
+
+def get_historical_many(alice, tokens, lookback_days, exchange='NSE'):
+    """Fetch daily history for many tokens; returns (instrument, cols) for the ones that succeed."""
+    return asyncio.run(get_historical_many_async(alice, tokens, lookback_days, exchange))
+
+async def _analyze_all_async(alice, tokens, lookback_days, exchange, analyze, *args):
+    """Fetch every token, then run ``analyze(instrument, cols, *args)`` on each in the CPU pool."""
+    loop = asyncio.get_running_loop()
+    fetched = await get_historical_many_async(alice, tokens, lookback_days, exchange)
+
+    results = []
+    pending = [loop.run_in_executor(_cpu_pool(), analyze, *f, *args) for f in fetched]
+    for next_result in asyncio.as_completed(pending):
+        result = await next_result
+        if result:
+            results.append(result)
+    return results
+
+def _stack_tail_aligned(arrays, dtype=np.float32):
+    """Stack 1-D arrays into an (N, T) matrix aligned on their last element, NaN-padded on the left."""
+    width = max((len(arr) for arr in arrays), default=0)
+    matrix = np.full((len(arrays), width), np.nan, dtype=dtype)
+    for row, arr in zip(matrix, arrays):
+        if len(arr):
+            row[-len(arr):] = arr
+    return matrix
+
+def as_dataframe(cols):
+    """Wrap a dict of column arrays in a DataFrame for DataFrame-based helpers."""
+    return pd.DataFrame(cols, copy=False)
+
+def identify_candlestick_patterns(cols):
     """Identify comprehensive candlestick patterns using the new detector."""
-    return detect_candlestick_patterns(df)
+    # The frame is new on every call, so build the detector directly rather than caching it
+    return CandlestickPatternDetector(as_dataframe(cols)).detect_all_patterns()
 
-def analyze_volume_profile(df):
+def analyze_volume_profile(cols):
     """Analyze volume profile and identify significant price levels."""
+    close = cols['close']
+    vol = cols['volume']
+    low_min = cols['low'].min()
+    high_max = cols['high'].max()
+
     # Create price bins
-    price_range = df['high'].max() - df['low'].min()
     num_bins = 50
-    bin_size = price_range / num_bins
-    
-    # Calculate volume profile
-    volume_profile = pd.DataFrame()
-    volume_profile['price_level'] = np.arange(df['low'].min(), df['high'].max(), bin_size)
-    volume_profile['volume'] = 0
-    
-    for i in range(len(df)):
-        price = df['close'].iloc[i]
-        volume = df['volume'].iloc[i]
-        bin_index = int((price - df['low'].min()) / bin_size)
-        if 0 <= bin_index < len(volume_profile):
-            volume_profile.iloc[bin_index, 1] += volume
-    
+    bin_size = (high_max - low_min) / num_bins
+    if not bin_size > 0:
+        return pd.DataFrame(columns=['price_level', 'volume'])
+
+    # Calculate volume profile in a single pass over the closes
+    inv_bin = np.float32(1.0 / bin_size)
+    volumes = _volume_profile_kernel(close, vol, low_min, inv_bin, num_bins)
+    price_level = low_min + np.arange(num_bins) * bin_size
+
     # Identify high volume nodes
-    mean_volume = volume_profile['volume'].mean()
-    std_volume = volume_profile['volume'].std()
-    high_volume_nodes = volume_profile[volume_profile['volume'] > mean_volume + std_volume]
-    
+    mask = volumes > volumes.mean() + volumes.std(ddof=1)
+    high_volume_nodes = pd.DataFrame({
+        'price_level': price_level[mask],
+        'volume': volumes[mask]
+    })
+
     return high_volume_nodes
 
-def analyze_market_structure(df):
+def analyze_market_structure(cols):
     """Analyze market structure using higher highs and lower lows."""
     # Find local maxima and minima
+    high = cols['high']
+    low = cols['low']
     window = 5
-    local_max = argrelextrema(df['high'].values, np.greater_equal, order=window)[0]
-    local_min = argrelextrema(df['low'].values, np.less_equal, order=window)[0]
+    local_max = _find_extrema(high, window, True)
+    local_min = _find_extrema(low, window, False)
     
     # Analyze last 3 swing points
-    recent_max = df['high'].iloc[local_max[-3:]]
-    recent_min = df['low'].iloc[local_min[-3:]]
+    recent_max = high[local_max[-3:]]
+    recent_min = low[local_min[-3:]]
     
     # Determine trend
     if len(recent_max) >= 2 and len(recent_min) >= 2:
-        higher_highs = recent_max.iloc[-1] > recent_max.iloc[-2]
-        higher_lows = recent_min.iloc[-1] > recent_min.iloc[-2]
+        higher_highs = recent_max[-1] > recent_max[-2]
+        higher_lows = recent_min[-1] > recent_min[-2]
         
         if higher_highs and higher_lows:
             return "Uptrend"
@@ -71,113 +334,106 @@ def analyze_market_structure(df):
 
 def analyze_stock_advanced(alice, token, strategy, exchange='NSE'):
     """Analyze stock using advanced strategies."""
-    try:
-        instrument, df = get_historical_data(
-            alice, token, datetime.now() - timedelta(days=365), datetime.now(), "D", exchange
-        )
-        if len(df) < 100:
-            return None
+    fetched = _fetch_or_none(alice, token, 365, exchange)
+    if fetched is None:
+        return None
+    return _analyze_advanced(*fetched, strategy)
 
-        result = {
-            'Name': instrument.symbol,
-            'Close': df['close'].iloc[-1],
-            'Volume': df['volume'].iloc[-1],
-            'Patterns': [],
-            'Candlestick_Patterns': '',
-            'Market_Structure': '',
-            'Volume_Nodes': [],
-            'Breakout_Type': '',
-            'Strength': 0
-        }
-
-        # Analyze candlestick patterns
-        patterns = identify_candlestick_patterns(df)
-        result['Patterns'] = patterns
-        result['Candlestick_Patterns'] = ', '.join(patterns) if patterns else 'None'
-        
-        # Analyze market structure
-        result['Market_Structure'] = analyze_market_structure(df)
+def _analyze_advanced(instrument, cols, strategy):
+    """Score one stock's history against an advanced strategy."""
+    close = cols['close']
+    vol = cols['volume']
+    if len(close) < 100:
+        return None
+
+    result = {
+        'Name': instrument.symbol,
+        'Close': close[-1],
+        'Volume': vol[-1],
+        'Patterns': [],
+        'Candlestick_Patterns': '',
+        'Market_Structure': '',
+        'Volume_Nodes': [],
+        'Breakout_Type': '',
+        'Strength': 0
+    }
+
+    # Analyze candlestick patterns
+    patterns = identify_candlestick_patterns(cols)
+    if strategy == "Price Action Breakout" and not patterns:
+        return None  # Strength can only come from patterns in this strategy
+    result['Patterns'] = patterns
+    result['Candlestick_Patterns'] = ', '.join(patterns) if patterns else 'None'
+    
+    # Analyze market structure
+    result['Market_Structure'] = analyze_market_structure(cols)
+    
+    # Analyze volume profile
+    volume_nodes = analyze_volume_profile(cols)
+    result['Volume_Nodes'] = volume_nodes['price_level'].tolist()
+    
+    # Calculate overall strength based on strategy
+    if strategy == "Price Action Breakout":
+        # Detect both breakouts and breakdowns with volume confirmation
+        volume_confirmation = vol[-1] > vol[-20:].mean() * 1.5
         
-        # Analyze volume profile
-        volume_nodes = analyze_volume_profile(df)
-        result['Volume_Nodes'] = volume_nodes['price_level'].tolist()
+        # Count bullish (breakout) and bearish (breakdown) patterns in one pass
+        bullish_count = 0
+        bearish_count = 0
+        for p in patterns:
+            pl = p.lower()
+            if any(k in pl for k in BULLISH_KEYWORDS):
+                bullish_count += 1
+            if any(k in pl for k in BEARISH_KEYWORDS):
+                bearish_count += 1
         
-        # Calculate overall strength based on strategy
-        if strategy == "Price Action Breakout":
-            # Detect both breakouts and breakdowns with volume confirmation
-            volume_confirmation = df['volume'].iloc[-1] > df['volume'].rolling(20).mean().iloc[-1] * 1.5
+        # Calculate strength based on pattern type and volume
+        if volume_confirmation:
+            if bullish_count:
+                result['Strength'] = bullish_count * 2
+                result['Breakout_Type'] = 'Bullish Breakout'
+            elif bearish_count:
+                result['Strength'] = bearish_count * 2
+                result['Breakout_Type'] = 'Bearish Breakdown'
+            elif patterns:  # Other patterns
+                result['Strength'] = len(patterns)
+                result['Breakout_Type'] = 'Neutral Pattern'
             
-            # Check for bullish patterns (breakouts)
-            bullish_patterns = [p for p in patterns if any(bullish in p.lower() for bullish in 
-                              ['bullish', 'hammer', 'inverted hammer', 'morning star', 'three white soldiers', 
-                               'piercing', 'bullish engulfing', 'bullish harami', 'three inside up', 'three outside up'])]
-            
-            # Check for bearish patterns (breakdowns)
-            bearish_patterns = [p for p in patterns if any(bearish in p.lower() for bearish in 
-                              ['bearish', 'hanging man', 'shooting star', 'evening star', 'three black crows',
-                               'dark cloud cover', 'bearish engulfing', 'bearish harami', 'three inside down', 'three outside down'])]
-            
-            # Calculate strength based on pattern type and volume
-            if volume_confirmation:
-                if bullish_patterns:
-                    result['Strength'] = len(bullish_patterns) * 2
-                    result['Breakout_Type'] = 'Bullish Breakout'
-                elif bearish_patterns:
-                    result['Strength'] = len(bearish_patterns) * 2
-                    result['Breakout_Type'] = 'Bearish Breakdown'
-                elif patterns:  # Other patterns
-                    result['Strength'] = len(patterns)
-                    result['Breakout_Type'] = 'Neutral Pattern'
-                
-        elif strategy == "Volume Profile Analysis":
-            # High volume nodes near current price
-            current_price = df['close'].iloc[-1]
-            nearby_nodes = volume_nodes[abs(volume_nodes['price_level'] - current_price) / current_price < 0.02]
-            result['Strength'] = len(nearby_nodes) * 3
+    elif strategy == "Volume Profile Analysis":
+        # High volume nodes near current price
+        current_price = close[-1]
+        nearby_nodes = volume_nodes[abs(volume_nodes['price_level'] - current_price) / current_price < 0.02]
+        result['Strength'] = len(nearby_nodes) * 3
+        
+    elif strategy == "Market Structure Analysis":
+        # Strong trend with confirmation
+        if result['Market_Structure'] in ['Uptrend', 'Downtrend']:
+            result['Strength'] = 5
             
-        elif strategy == "Market Structure Analysis":
-            # Strong trend with confirmation
-            if result['Market_Structure'] in ['Uptrend', 'Downtrend']:
-                result['Strength'] = 5
-                
-        elif strategy == "Multi-Factor Analysis":
-            # Combine all factors
-            strength = 0
-            strength += len(patterns) * 2  # Candlestick patterns
-            strength += len(result['Volume_Nodes'])  # Volume nodes
-            strength += 5 if result['Market_Structure'] in ['Uptrend', 'Downtrend'] else 0  # Market structure
-            result['Strength'] = strength
-
-        return result if result['Strength'] > 0 else None
+    elif strategy == "Multi-Factor Analysis":
+        # Combine all factors
+        strength = 0
+        strength += len(patterns) * 2  # Candlestick patterns
+        strength += len(result['Volume_Nodes'])  # Volume nodes
+        strength += 5 if result['Market_Structure'] in ['Uptrend', 'Downtrend'] else 0  # Market structure
+        result['Strength'] = strength
 
-    except Exception as e:
-        print(f"Error analyzing {token}: {e}")
-        return None
+    return result if result['Strength'] > 0 else None
+
+async def analyze_all_tokens_advanced_async(alice, tokens, strategy, exchange='NSE'):
+    """Analyze all tokens using advanced strategies concurrently."""
+    return await _analyze_all_async(alice, tokens, 365, exchange, _analyze_advanced, strategy)
 
 def analyze_all_tokens_advanced(alice, tokens, strategy, exchange='NSE'):
     """Analyze all tokens using advanced strategies in parallel."""
-    results = []
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        future_to_token = {
-            executor.submit(analyze_stock_advanced, alice, token, strategy, exchange): token
-            for token in tokens
-        }
-        for future in as_completed(future_to_token):
-            token = future_to_token[future]
-            try:
-                result = future.result()
-                if result:
-                    results.append(result)
-            except Exception as e:
-                print(f"Error processing {token}: {e}")
-    return results
+    return asyncio.run(analyze_all_tokens_advanced_async(alice, tokens, strategy, exchange))
 
-def analyze_price_movement(df, duration_days, target_percentage, direction='up'):
+def analyze_price_movement(cols, duration_days, target_percentage, direction='up'):
     """
     Analyze price movement over a specified duration.
     
     Args:
-        df: DataFrame with price data
+        cols: Dict of OHLCV column arrays
         duration_days: Number of days to look back
         target_percentage: Target percentage change
         direction: 'up' or 'down' for price movement direction
@@ -185,23 +441,49 @@ def analyze_price_movement(df, duration_days, target_percentage, direction='up')
     Returns:
         tuple: (percentage_change, met_criteria)
     """
-    if len(df) < duration_days:
+    close = cols['close']
+    if len(close) < duration_days:
         return 0, False
     
+    percentage_changes, met_mask = analyze_price_movement_batch(
+        close[np.newaxis, :], duration_days, target_percentage, direction
+    )
+    return percentage_changes[0], met_mask[0]
+
+def analyze_price_movement_batch(close_matrix, duration_days, target_percentage, direction='up'):
+    """
+    Analyze price movement for many stocks at once.
+    
+    Args:
+        close_matrix: (N, T) array of closes, one stock per row, aligned on the
+            latest bar and NaN-padded on the left
+        duration_days: Number of days to look back
+        target_percentage: Target percentage change
+        direction: 'up' or 'down' for price movement direction
+    
+    Returns:
+        tuple: (percentage_changes, met_mask) arrays of length N; rows without
+            duration_days of history are NaN / False
+    """
+    n_stocks, n_bars = close_matrix.shape
+    if n_bars < duration_days:
+        return np.full(n_stocks, np.nan, dtype=close_matrix.dtype), np.zeros(n_stocks, dtype=bool)
+    
     # Get the price from duration_days ago and current price
-    start_price = df['close'].iloc[-duration_days]
-    current_price = df['close'].iloc[-1]
+    start_price = close_matrix[:, -duration_days]
+    current_price = close_matrix[:, -1]
     
     # Calculate percentage change
-    percentage_change = ((current_price - start_price) / start_price) * 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage_changes = ((current_price - start_price) / start_price) * 100
     
     # Check if criteria is met
     if direction == 'up':
-        met_criteria = percentage_change >= target_percentage
+        met_mask = percentage_changes >= target_percentage
     else:  # down
-        met_criteria = percentage_change <= -target_percentage
+        met_mask = percentage_changes <= -target_percentage
     
-    return percentage_change, met_criteria
+    return percentage_changes, met_mask
 
 def analyze_stock_custom(alice, token, duration_days, target_percentage, direction='up', exchange='NSE'):
     """
@@ -218,71 +500,61 @@ def analyze_stock_custom(alice, token, duration_days, target_percentage, directi
     Returns:
         dict: Analysis results or None if criteria not met
     """
-    try:
-        # Get more historical data than needed to ensure we have enough
-        lookback_days = max(duration_days * 2, 365)  # At least double the duration or 1 year
-        instrument, df = get_historical_data(
-            alice, token, 
-            datetime.now() - timedelta(days=lookback_days), 
-            datetime.now(), 
-            "D", 
-            exchange
-        )
-        
-        if len(df) < duration_days:
-            return None
+    # Get more historical data than needed to ensure we have enough
+    lookback_days = max(duration_days * 2, 365)  # At least double the duration or 1 year
+    fetched = _fetch_or_none(alice, token, lookback_days, exchange)
+    if fetched is None:
+        return None
+    return _analyze_custom(*fetched, duration_days, target_percentage, direction)
 
-        # Calculate price movement
-        percentage_change, met_criteria = analyze_price_movement(
-            df, duration_days, target_percentage, direction
-        )
-        
-        if not met_criteria:
-            return None
+def _analyze_custom(instrument, cols, duration_days, target_percentage, direction):
+    """Check one stock's history against the custom price movement criteria."""
+    results = _screen_custom([(instrument, cols)], duration_days, target_percentage, direction)
+    return results[0] if results else None
 
-        # Additional analysis for context
-        volume_trend = df['volume'].iloc[-5:].mean() > df['volume'].iloc[-20:].mean()
-        volatility = df['close'].pct_change().std() * 100
-        
-        result = {
+def _screen_custom(fetched, duration_days, target_percentage, direction):
+    """Screen (instrument, cols) pairs against the custom criteria, one matrix op per statistic."""
+    close_matrix = _stack_tail_aligned([cols['close'] for _, cols in fetched])
+    percentage_changes, met_mask = analyze_price_movement_batch(
+        close_matrix, duration_days, target_percentage, direction
+    )
+    hits = np.flatnonzero(met_mask)
+    if len(hits) == 0:
+        return []
+
+    # Additional analysis for context, only for the stocks that met the criteria
+    hit_closes = close_matrix[hits]
+    hit_volumes = _stack_tail_aligned([fetched[i][1]['volume'] for i in hits], dtype=np.float64)
+    volume_trend = np.nanmean(hit_volumes[:, -5:], axis=1) > np.nanmean(hit_volumes[:, -20:], axis=1)
+    returns = np.diff(hit_closes, axis=1)
+    returns /= hit_closes[:, :-1]
+    volatility = np.nanstd(returns, axis=1, ddof=1) * 100
+
+    results = []
+    for row, i in enumerate(hits):
+        instrument = fetched[i][0]
+        percentage_change = percentage_changes[i]
+        results.append({
             'Name': instrument.symbol,
-            'Close': df['close'].iloc[-1],
-            'Start_Price': df['close'].iloc[-duration_days],
+            'Close': hit_closes[row, -1],
+            'Start_Price': hit_closes[row, -duration_days],
             'Percentage_Change': percentage_change,
-            'Volume_Trend': 'Increasing' if volume_trend else 'Decreasing',
-            'Volatility': volatility,
+            'Volume_Trend': 'Increasing' if volume_trend[row] else 'Decreasing',
+            'Volatility': volatility[row],
             'Duration_Days': duration_days,
             'Direction': direction.capitalize(),
             'Strength': abs(percentage_change) / target_percentage  # Normalized strength
-        }
-        
-        return result
+        })
+    return results
 
-    except Exception as e:
-        print(f"Error analyzing {token}: {e}")
-        return None
+async def analyze_all_tokens_custom_async(alice, tokens, duration_days, target_percentage, direction='up', exchange='NSE'):
+    """Analyze all tokens using custom criteria concurrently."""
+    lookback_days = max(duration_days * 2, 365)
+    fetched = await get_historical_many_async(alice, tokens, lookback_days, exchange)
+    return _screen_custom(fetched, duration_days, target_percentage, direction)
 
 def analyze_all_tokens_custom(alice, tokens, duration_days, target_percentage, direction='up', exchange='NSE'):
     """Analyze all tokens using custom criteria in parallel."""
-    results = []
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        future_to_token = {
-            executor.submit(
-                analyze_stock_custom, 
-                alice, 
-                token, 
-                duration_days, 
-                target_percentage, 
-                direction, 
-                exchange
-            ): token for token in tokens
-        }
-        for future in as_completed(future_to_token):
-            token = future_to_token[future]
-            try:
-                result = future.result()
-                if result:
-                    results.append(result)
-            except Exception as e:
-                print(f"Error processing {token}: {e}")
-    return results 
+    return asyncio.run(analyze_all_tokens_custom_async(
+        alice, tokens, duration_days, target_percentage, direction, exchange
+    ))
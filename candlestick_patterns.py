@@ -1,6 +1,442 @@
+import sys
+import threading
 import pandas as pd
 import numpy as np
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
 from typing import List, Optional, Tuple, Dict
+from _njit import njit, NUMBA_AVAILABLE
+
+# Scalar values of a single candle, as read by the pattern predicates
+Candle = namedtuple('Candle', [
+    'open', 'high', 'low', 'close', 'body', 'body_size',
+    'upper_shadow', 'lower_shadow', 'total_size', 'is_bullish', 'is_bearish',
+    'total_size_tenth', 'body_size_tenth', 'two_body_size', 'half_body_size'
+])
+
+# Two-candle patterns formed by the first and second candles of a three-candle window
+_PairPatterns = namedtuple('_PairPatterns', [
+    'bullish_harami', 'bearish_harami', 'bullish_engulfing', 'bearish_engulfing'
+])
+
+
+# Bits of the packed per-candle flags
+_BULLISH = 1
+_BEARISH = 2
+_DOJI = 4
+
+
+def _shift(arr: np.ndarray, k: int) -> np.ndarray:
+    """Shift ``arr`` forward by ``k`` rows, filling the head with NaN (zero for non-float arrays)."""
+    out = np.empty_like(arr)
+    out[:k] = np.nan if arr.dtype.kind == 'f' else 0
+    out[k:] = arr[:max(len(arr) - k, 0)]
+    return out
+
+
+def _has(codes: np.ndarray, bits: int) -> np.ndarray:
+    """Rows whose packed flag codes have all of ``bits`` set."""
+    return (codes & bits) == bits
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of each row and up to ``window - 1`` rows before it, via a cumulative sum."""
+    csum = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    sums = csum[1:].copy()
+    if len(values) > window:
+        sums[window:] -= csum[1:len(values) + 1 - window]
+    return sums
+
+
+def _rolling_mean(values: np.ndarray, window: int = 20) -> np.ndarray:
+    """
+    Trailing mean over ``window`` rows.
+    
+    Matches ``Series.rolling(window, min_periods=1).mean()``: NaNs are skipped
+    and the first rows average over however many rows are available.
+    """
+    valid = ~np.isnan(values)
+    sums = _window_sums(np.where(valid, values, 0.0), window)
+    counts = _window_sums(valid, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+# Rows of the detector's float block, one contiguous row per candle property
+_SOA_FIELDS = (
+    'open', 'high', 'low', 'close', 'body', 'body_size', 'upper_shadow', 'lower_shadow',
+    'total_size', 'total_size_tenth', 'body_size_tenth', 'two_body_size', 'half_body_size',
+    'avg_body_size', 'avg_total_size',
+)
+(_OPEN, _HIGH, _LOW, _CLOSE, _BODY, _BODY_SIZE, _UPPER_SHADOW, _LOWER_SHADOW,
+ _TOTAL_SIZE, _TOTAL_SIZE_TENTH, _BODY_SIZE_TENTH, _TWO_BODY_SIZE, _HALF_BODY_SIZE,
+ _AVG_BODY_SIZE, _AVG_TOTAL_SIZE) = range(len(_SOA_FIELDS))
+
+
+def _candle_properties(soa: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Fill the derived rows of ``soa`` from its OHLC rows.
+    
+    Returns the direction and packed flag arrays of the same candles.
+    """
+    o, h, l, c = soa[_OPEN], soa[_HIGH], soa[_LOW], soa[_CLOSE]
+    body, body_size, total_size = soa[_BODY], soa[_BODY_SIZE], soa[_TOTAL_SIZE]
+    np.subtract(c, o, out=body)
+    np.fabs(body, out=body_size)
+    np.subtract(h, np.maximum(o, c), out=soa[_UPPER_SHADOW])
+    np.subtract(np.minimum(o, c), l, out=soa[_LOWER_SHADOW])
+    np.subtract(h, l, out=total_size)
+    
+    # Thresholds shared by several predicates
+    np.multiply(total_size, 0.1, out=soa[_TOTAL_SIZE_TENTH])
+    np.multiply(body_size, 0.1, out=soa[_BODY_SIZE_TENTH])
+    np.multiply(body_size, 2, out=soa[_TWO_BODY_SIZE])
+    np.divide(body_size, 2, out=soa[_HALF_BODY_SIZE])
+    
+    # Direction and doji shape packed into one byte per candle
+    is_bullish = body > 0
+    is_bearish = body < 0
+    doji = body_size <= soa[_TOTAL_SIZE_TENTH]
+    flags = (is_bullish.view(np.uint8) * np.uint8(_BULLISH) |
+             is_bearish.view(np.uint8) * np.uint8(_BEARISH) |
+             doji.view(np.uint8) * np.uint8(_DOJI))
+    return {'is_bullish': is_bullish, 'is_bearish': is_bearish, 'flags': flags}
+
+
+# Window of the average body / total size used for relative measurements
+_AVG_WINDOW = 20
+
+# Pattern names in detection order; bit k of a row bitmask is _PATTERN_NAMES[k].
+# Interned so every result refers to the same string objects.
+_PATTERN_NAMES = tuple(map(sys.intern, (
+    'Dragonfly Doji', 'Gravestone Doji', 'Doji', 'Long-legged Doji',
+    'Hammer', 'Inverted Hammer', 'Hanging Man', 'Shooting Star', 'Spinning Top',
+    'Bullish Marubozu', 'Bearish Marubozu',
+    'Bullish Engulfing', 'Bearish Engulfing', 'Bullish Harami', 'Bearish Harami',
+    'Harami Cross', 'Piercing Pattern', 'Dark Cloud Cover', 'Tweezer Tops', 'Tweezer Bottoms',
+    'Morning Star', 'Evening Star', 'Three White Soldiers', 'Three Black Crows',
+    'Three Inside Up', 'Three Inside Down', 'Three Outside Up', 'Three Outside Down',
+)))
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True, inline='always')
+    def _detect_row_kernel(soa, flags, i):
+        """
+        Bitmask of the patterns ending at candle ``i`` of the detector's float block.
+        
+        Conditions are combined with ``&``/``|`` rather than ``and``/``if`` so each
+        row runs as straight-line code. Values are widened to float64 on load to
+        match the scalar Python predicates.
+        """
+        f8 = np.float64
+        bs, us, ls, ts = f8(soa[_BODY_SIZE, i]), f8(soa[_UPPER_SHADOW, i]), f8(soa[_LOWER_SHADOW, i]), f8(soa[_TOTAL_SIZE, i])
+        ts_tenth, bs_tenth, two_bs = f8(soa[_TOTAL_SIZE_TENTH, i]), f8(soa[_BODY_SIZE_TENTH, i]), f8(soa[_TWO_BODY_SIZE, i])
+        avg_body = f8(soa[_AVG_BODY_SIZE, i])
+        bull = (flags[i] & _BULLISH) != 0
+        bear = (flags[i] & _BEARISH) != 0
+        doji = (flags[i] & _DOJI) != 0
+        
+        # Single candlestick patterns
+        short_upper = us <= ts_tenth
+        short_lower = ls <= ts_tenth
+        dragonfly = doji & short_upper & (ls > two_bs)
+        gravestone = doji & (not dragonfly) & short_lower & (us > two_bs)
+        other_doji = doji & (not dragonfly) & (not gravestone)
+        long_legged = (other_doji & (not (short_upper & short_lower)) &
+                       (us > 0.2 * ts) & (ls > 0.2 * ts))
+        small_body = bs < avg_body
+        hammer = (ls > 2 * avg_body) & (us < avg_body) & small_body
+        inverted = (us > 2 * avg_body) & (ls < avg_body) & small_body
+        spinning_top = (us > avg_body) & (ls > avg_body) & small_body
+        marubozu = (bs > 2 * avg_body) & (us < bs_tenth) & (ls < bs_tenth)
+        mask = (dragonfly | gravestone << 1 | (other_doji & (not long_legged)) << 2 |
+                long_legged << 3 | hammer << 4 | inverted << 5 | (hammer & bear) << 6 |
+                (inverted & bear) << 7 | spinning_top << 8 | (marubozu & bull) << 9 |
+                (marubozu & (not bull)) << 10)
+        
+        # Two-candlestick patterns
+        if i < 1:
+            return mask
+        j = i - 1
+        o, h, l, c = f8(soa[_OPEN, i]), f8(soa[_HIGH, i]), f8(soa[_LOW, i]), f8(soa[_CLOSE, i])
+        po, ph, pl, pc = f8(soa[_OPEN, j]), f8(soa[_HIGH, j]), f8(soa[_LOW, j]), f8(soa[_CLOSE, j])
+        phalf = f8(soa[_HALF_BODY_SIZE, j])
+        pbull = (flags[j] & _BULLISH) != 0
+        pbear = (flags[j] & _BEARISH) != 0
+        bullish_harami = pbear & bull & (h < po) & (l > pc)
+        bearish_harami = pbull & bear & (h < pc) & (l > po)
+        mask |= ((pbear & bull & (o < pc) & (c > po)) << 11 |
+                 (pbull & bear & (o > pc) & (c < po)) << 12 |
+                 bullish_harami << 13 | bearish_harami << 14 |
+                 ((bullish_harami | bearish_harami) & doji) << 15 |
+                 (pbear & bull & (o < pl) & (c > pc + phalf)) << 16 |
+                 (pbull & bear & (o > ph) & (c < pc - phalf)) << 17 |
+                 (pbull & bear & (abs(h - ph) < 0.1 * h)) << 18 |
+                 (pbear & bull & (abs(l - pl) < 0.1 * l)) << 19)
+        
+        # Three-candlestick patterns
+        if i < 2:
+            return mask
+        f = i - 2
+        fo, fc = f8(soa[_OPEN, f]), f8(soa[_CLOSE, f])
+        fbull = (flags[f] & _BULLISH) != 0
+        fbear = (flags[f] & _BEARISH) != 0
+        small_middle = f8(soa[_BODY_SIZE, j]) < f8(soa[_HALF_BODY_SIZE, f])
+        midpoint = (fo + fc) / 2
+        mask |= ((fbear & small_middle & bull & (c > midpoint)) << 20 |
+                 (fbull & small_middle & bear & (c < midpoint)) << 21 |
+                 (fbull & pbull & bull & (po > fo) & (o > po) & (pc > fc) & (c > pc)) << 22 |
+                 (fbear & pbear & bear & (po < fo) & (o < po) & (pc < fc) & (c < pc)) << 23 |
+                 (fbear & pbull & (ph < fo) & (pl > fc) & bull & (c > ph)) << 24 |
+                 (fbull & pbear & (ph < fc) & (pl > fo) & bear & (c < pl)) << 25 |
+                 (fbear & pbull & (po < fc) & (pc > fo) & bull & (c > ph)) << 26 |
+                 (fbull & pbear & (po > fc) & (pc < fo) & bear & (c < pl)) << 27)
+        return mask
+
+    @njit(cache=True, nogil=True)
+    def _detect_rows_kernel(soa, flags, n):
+        """Boolean (candle, pattern) matrix for the first ``n`` candles."""
+        out = np.empty((n, len(_PATTERN_NAMES)), dtype=np.bool_)
+        for i in range(n):
+            mask = _detect_row_kernel(soa, flags, i)
+            for k in range(len(_PATTERN_NAMES)):
+                out[i, k] = mask >> k & 1
+        return out
+
+    # Compile for the default float32 arrays at import so the first detection doesn't pay for it
+    _detect_row_kernel(np.zeros((len(_SOA_FIELDS), 3), np.float32), np.zeros(3, np.uint8), 2)
+    _detect_rows_kernel(np.zeros((len(_SOA_FIELDS), 3), np.float32), np.zeros(3, np.uint8), 3)
+
+
+# Single candlestick pattern predicates
+def _is_doji(candle: Candle, avg_total: float) -> bool:
+    """Check if candle is a doji."""
+    return candle.body_size <= candle.total_size_tenth
+
+
+def _classify_doji(candle: Candle) -> Optional[str]:
+    """Return the doji variant of the candle, or None if it is not a doji."""
+    upper, lower, tenth = candle.upper_shadow, candle.lower_shadow, candle.total_size_tenth
+    if not candle.body_size <= tenth:
+        return None
+    if upper <= tenth and lower > candle.two_body_size:
+        return 'Dragonfly Doji'
+    if lower <= tenth and upper > candle.two_body_size:
+        return 'Gravestone Doji'
+    if upper <= tenth and lower <= tenth:
+        return 'Doji'
+    if upper > 0.2 * candle.total_size and lower > 0.2 * candle.total_size:
+        return 'Long-legged Doji'
+    return 'Doji'
+
+
+def _is_hammer(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is a hammer."""
+    return (candle.lower_shadow > 2 * avg_body and
+            candle.upper_shadow < avg_body and
+            candle.body_size < avg_body)
+
+
+def _is_inverted_hammer(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is an inverted hammer."""
+    return (candle.upper_shadow > 2 * avg_body and
+            candle.lower_shadow < avg_body and
+            candle.body_size < avg_body)
+
+
+def _is_hanging_man(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is a hanging man."""
+    return (candle.lower_shadow > 2 * avg_body and
+            candle.upper_shadow < avg_body and
+            candle.body_size < avg_body and
+            candle.is_bearish)
+
+
+def _is_shooting_star(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is a shooting star."""
+    return (candle.upper_shadow > 2 * avg_body and
+            candle.lower_shadow < avg_body and
+            candle.body_size < avg_body and
+            candle.is_bearish)
+
+
+def _is_spinning_top(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is a spinning top."""
+    return (candle.upper_shadow > avg_body and
+            candle.lower_shadow > avg_body and
+            candle.body_size < avg_body)
+
+
+def _is_marubozu(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is a marubozu."""
+    return (candle.body_size > 2 * avg_body and
+            candle.upper_shadow < candle.body_size_tenth and
+            candle.lower_shadow < candle.body_size_tenth)
+
+
+def _is_bullish_marubozu(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is a bullish marubozu."""
+    return candle.is_bullish and _is_marubozu(candle, avg_body)
+
+
+def _is_bearish_marubozu(candle: Candle, avg_body: float) -> bool:
+    """Check if candle is a bearish marubozu."""
+    return not candle.is_bullish and _is_marubozu(candle, avg_body)
+
+
+# Two-candlestick pattern predicates
+def _is_bullish_engulfing(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is bullish engulfing."""
+    return (previous.is_bearish and
+            current.is_bullish and
+            current.open < previous.close and
+            current.close > previous.open)
+
+
+def _is_bearish_engulfing(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is bearish engulfing."""
+    return (previous.is_bullish and
+            current.is_bearish and
+            current.open > previous.close and
+            current.close < previous.open)
+
+
+def _is_bullish_harami(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is bullish harami."""
+    return (previous.is_bearish and
+            current.is_bullish and
+            current.high < previous.open and
+            current.low > previous.close)
+
+
+def _is_bearish_harami(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is bearish harami."""
+    return (previous.is_bullish and
+            current.is_bearish and
+            current.high < previous.close and
+            current.low > previous.open)
+
+
+def _is_harami_cross(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is harami cross."""
+    # The doji test is one comparison and rarely passes, so it gates the harami checks
+    return _is_doji(current, current.total_size) and (_is_bullish_harami(current, previous) or
+                                                      _is_bearish_harami(current, previous))
+
+
+def _is_piercing_pattern(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is piercing pattern."""
+    return (previous.is_bearish and
+            current.is_bullish and
+            current.open < previous.low and
+            current.close > previous.close + previous.half_body_size)
+
+
+def _is_dark_cloud_cover(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is dark cloud cover."""
+    return (previous.is_bullish and
+            current.is_bearish and
+            current.open > previous.high and
+            current.close < previous.close - previous.half_body_size)
+
+
+def _is_tweezer_tops(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is tweezer tops."""
+    return (abs(current.high - previous.high) < 0.1 * current.high and
+            current.is_bearish and previous.is_bullish)
+
+
+def _is_tweezer_bottoms(current: Candle, previous: Candle) -> bool:
+    """Check if pattern is tweezer bottoms."""
+    return (abs(current.low - previous.low) < 0.1 * current.low and
+            current.is_bullish and previous.is_bearish)
+
+
+# Three-candlestick pattern predicates
+def _is_morning_star(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is morning star."""
+    return (first.is_bearish and
+            second.body_size < first.half_body_size and
+            third.is_bullish and
+            third.close > (first.open + first.close) / 2)
+
+
+def _is_evening_star(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is evening star."""
+    return (first.is_bullish and
+            second.body_size < first.half_body_size and
+            third.is_bearish and
+            third.close < (first.open + first.close) / 2)
+
+
+def _is_three_white_soldiers(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is three white soldiers."""
+    return (first.is_bullish and second.is_bullish and third.is_bullish and
+            second.open > first.open and third.open > second.open and
+            second.close > first.close and third.close > second.close)
+
+
+def _is_three_black_crows(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is three black crows."""
+    return (first.is_bearish and second.is_bearish and third.is_bearish and
+            second.open < first.open and third.open < second.open and
+            second.close < first.close and third.close < second.close)
+
+
+def _is_three_inside_up(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is three inside up."""
+    # A bullish harami already requires the first candle to be bearish
+    return pair.bullish_harami and third.is_bullish and third.close > second.high
+
+
+def _is_three_inside_down(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is three inside down."""
+    return pair.bearish_harami and third.is_bearish and third.close < second.low
+
+
+def _is_three_outside_up(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is three outside up."""
+    return pair.bullish_engulfing and third.is_bullish and third.close > second.high
+
+
+def _is_three_outside_down(first: Candle, second: Candle, third: Candle, pair: _PairPatterns) -> bool:
+    """Check if pattern is three outside down."""
+    return pair.bearish_engulfing and third.is_bearish and third.close < second.low
+
+
+# Pattern predicates in detection order
+_SINGLE_PATTERNS = (
+    (_is_hammer, 'Hammer'),
+    (_is_inverted_hammer, 'Inverted Hammer'),
+    (_is_hanging_man, 'Hanging Man'),
+    (_is_shooting_star, 'Shooting Star'),
+    (_is_spinning_top, 'Spinning Top'),
+    (_is_bullish_marubozu, 'Bullish Marubozu'),
+    (_is_bearish_marubozu, 'Bearish Marubozu'),
+)
+
+_TWO_PATTERNS = (
+    (_is_bullish_engulfing, 'Bullish Engulfing'),
+    (_is_bearish_engulfing, 'Bearish Engulfing'),
+    (_is_bullish_harami, 'Bullish Harami'),
+    (_is_bearish_harami, 'Bearish Harami'),
+    (_is_harami_cross, 'Harami Cross'),
+    (_is_piercing_pattern, 'Piercing Pattern'),
+    (_is_dark_cloud_cover, 'Dark Cloud Cover'),
+    (_is_tweezer_tops, 'Tweezer Tops'),
+    (_is_tweezer_bottoms, 'Tweezer Bottoms'),
+)
+
+_THREE_PATTERNS = (
+    (_is_morning_star, 'Morning Star'),
+    (_is_evening_star, 'Evening Star'),
+    (_is_three_white_soldiers, 'Three White Soldiers'),
+    (_is_three_black_crows, 'Three Black Crows'),
+    (_is_three_inside_up, 'Three Inside Up'),
+    (_is_three_inside_down, 'Three Inside Down'),
+    (_is_three_outside_up, 'Three Outside Up'),
+    (_is_three_outside_down, 'Three Outside Down'),
+)
+
 
 class CandlestickPatternDetector:
     """
@@ -9,14 +445,20 @@ class CandlestickPatternDetector:
     Detects single, two, and three-candlestick patterns using OHLC data.
     """
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, dtype=np.float32):
         """
         Initialize the pattern detector with OHLC data.
         
         Args:
-            df: DataFrame with columns ['open', 'high', 'low', 'close', 'volume']
+            df: DataFrame with columns ['open', 'high', 'low', 'close', 'volume'].
+                It is referenced, not copied, and is never modified.
+            dtype: Float dtype of the derived arrays. float32 halves the memory
+                traffic; candles within float32 rounding of a threshold may be
+                classified differently than with float64.
         """
-        self.df = df.copy()
+        self.df = df
+        self.dtype = np.dtype(dtype)
+        self._window = None
         self._prepare_data()
     
     def _prepare_data(self):
@@ -27,18 +469,98 @@ class CandlestickPatternDetector:
             if col not in self.df.columns:
                 raise ValueError(f"Missing required column: {col}")
         
-        # Calculate basic candle properties
-        self.df['body'] = self.df['close'] - self.df['open']
-        self.df['body_size'] = abs(self.df['body'])
-        self.df['upper_shadow'] = self.df['high'] - self.df[['open', 'close']].max(axis=1)
-        self.df['lower_shadow'] = self.df[['open', 'close']].min(axis=1) - self.df['low']
-        self.df['total_size'] = self.df['high'] - self.df['low']
-        self.df['is_bullish'] = self.df['body'] > 0
-        self.df['is_bearish'] = self.df['body'] < 0
+        # Derived float properties live in one (field, candle) block; each
+        # attribute such as self.body_size is a contiguous row view into it
+        self._soa = np.empty((len(_SOA_FIELDS), len(self.df)), dtype=self.dtype)
+        for k, col in enumerate(required_cols):
+            self._soa[k] = self.df[col].to_numpy()
+        self._buffers = _candle_properties(self._soa)
         
         # Calculate average body size for relative measurements
-        self.avg_body_size = self.df['body_size'].rolling(window=20, min_periods=1).mean()
-        self.avg_total_size = self.df['total_size'].rolling(window=20, min_periods=1).mean()
+        self._soa[_AVG_BODY_SIZE] = _rolling_mean(self._soa[_BODY_SIZE], _AVG_WINDOW)
+        self._soa[_AVG_TOTAL_SIZE] = _rolling_mean(self._soa[_TOTAL_SIZE], _AVG_WINDOW)
+        self._bind_views(len(self.df))
+    
+    def _bind_views(self, n: int):
+        """Point the per-candle attributes at the first ``n`` candles of the backing arrays."""
+        for k, name in enumerate(_SOA_FIELDS):
+            setattr(self, name, self._soa[k, :n])
+        for name, buf in self._buffers.items():
+            setattr(self, name, buf[:n])
+    
+    def update(self, new_row: Dict[str, float]) -> None:
+        """
+        Append one candle, updating the derived arrays incrementally.
+        
+        The arrays grow by doubling and the 20-bar averages are kept as running
+        sums over a ring buffer, so each call is amortized O(1). Appended candles
+        are not added to ``df``.
+        
+        Args:
+            new_row: Mapping with 'open', 'high', 'low' and 'close' values
+        """
+        for col in ('open', 'high', 'low', 'close'):
+            if col not in new_row:
+                raise ValueError(f"Missing required column: {col}")
+        if self._window is None:
+            self._seed_window()
+        
+        n = len(self.body)
+        if n == self._soa.shape[1]:
+            self._grow(max(2 * n, 64))
+        
+        column = self._soa[:, n:n + 1]
+        for k, col in enumerate(('open', 'high', 'low', 'close')):
+            column[k] = new_row[col]
+        for name, values in _candle_properties(column).items():
+            self._buffers[name][n] = values[0]
+        
+        # Swap the new sizes into the ring slot of the candle leaving the window
+        slot = n % _AVG_WINDOW
+        new = column[[_BODY_SIZE, _TOTAL_SIZE], 0].astype(np.float64)
+        old = self._window[:, slot]
+        self._window_sums += np.nan_to_num(new) - np.nan_to_num(old)
+        self._window_counts += np.isnan(old).astype(np.int64) - np.isnan(new)
+        self._window[:, slot] = new
+        if slot == 0:
+            # Re-sum once per lap so rounding in the running sums can't accumulate
+            self._window_sums = np.nansum(self._window, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            column[[_AVG_BODY_SIZE, _AVG_TOTAL_SIZE], 0] = self._window_sums / self._window_counts
+        
+        self._bind_views(n + 1)
+    
+    def _grow(self, capacity: int):
+        """Reallocate the backing arrays with room for ``capacity`` candles."""
+        n = len(self.body)
+        soa = np.empty((len(_SOA_FIELDS), capacity), dtype=self.dtype)
+        soa[:, :n] = self._soa[:, :n]
+        self._soa = soa
+        for name, buf in self._buffers.items():
+            grown = np.empty(capacity, dtype=buf.dtype)
+            grown[:n] = buf[:n]
+            self._buffers[name] = grown
+    
+    def _seed_window(self):
+        """Load the last _AVG_WINDOW body and total sizes into the averaging ring buffer."""
+        n = len(self.body)
+        # Slotted by candle index % _AVG_WINDOW
+        self._window = np.full((2, _AVG_WINDOW), np.nan)
+        for k in range(max(n - _AVG_WINDOW, 0), n):
+            self._window[:, k % _AVG_WINDOW] = self.body_size[k], self.total_size[k]
+        self._window_sums = np.nansum(self._window, axis=1)
+        self._window_counts = np.count_nonzero(~np.isnan(self._window), axis=1)
+    
+    def _row(self, i: int) -> Candle:
+        """Return the properties of candle ``i`` as plain Python scalars."""
+        return Candle(
+            float(self.open[i]), float(self.high[i]), float(self.low[i]), float(self.close[i]),
+            float(self.body[i]), float(self.body_size[i]), float(self.upper_shadow[i]),
+            float(self.lower_shadow[i]), float(self.total_size[i]),
+            bool(self.is_bullish[i]), bool(self.is_bearish[i]),
+            float(self.total_size_tenth[i]), float(self.body_size_tenth[i]),
+            float(self.two_body_size[i]), float(self.half_body_size[i])
+        )
     
     def detect_all_patterns(self) -> List[str]:
         """
@@ -47,330 +569,159 @@ class CandlestickPatternDetector:
         Returns:
             List of detected pattern names
         """
-        patterns = []
-        
-        # Single candlestick patterns
-        patterns.extend(self._detect_single_candlestick_patterns())
+        i = len(self.body) - 1
+        if NUMBA_AVAILABLE and i >= 0:
+            mask = _detect_row_kernel(self._soa, self.flags, i)
+            return [name for k, name in enumerate(_PATTERN_NAMES) if mask >> k & 1]
+        
+        return [
+            *self._detect_single_candlestick_patterns(),
+            *self._detect_two_candlestick_patterns(),
+            *self._detect_three_candlestick_patterns(),
+        ]
+    
+    def detect_all_patterns_vectorized(self) -> pd.DataFrame:
+        """
+        Detect candlestick patterns for every row of the data at once.
         
-        # Two-candlestick patterns
-        patterns.extend(self._detect_two_candlestick_patterns())
+        Row ``i`` flags the same patterns ``detect_all_patterns`` reports for
+        the data up to and including row ``i``.
         
-        # Three-candlestick patterns
-        patterns.extend(self._detect_three_candlestick_patterns())
+        Returns:
+            Boolean DataFrame indexed like the input (or by position once rows
+            have been added with ``update``), one column per pattern
+        """
+        index = self.df.index if len(self.df) == len(self.body) else None
+        if NUMBA_AVAILABLE:
+            found = _detect_rows_kernel(self._soa, self.flags, len(self.body))
+            return pd.DataFrame(found, index=index, columns=list(_PATTERN_NAMES))
+        
+        # Widened to float64 like the scalar predicates and the kernel, so sums such
+        # as pc + phalf round the same way on ties
+        soa = self._soa[:, :len(self.body)].astype(np.float64)
+        o, h, l, c = soa[_OPEN], soa[_HIGH], soa[_LOW], soa[_CLOSE]
+        bs, us, ls, ts = soa[_BODY_SIZE], soa[_UPPER_SHADOW], soa[_LOWER_SHADOW], soa[_TOTAL_SIZE]
+        ts_tenth, bs_tenth = soa[_TOTAL_SIZE_TENTH], soa[_BODY_SIZE_TENTH]
+        two_bs, half_bs = soa[_TWO_BODY_SIZE], soa[_HALF_BODY_SIZE]
+        avg_body = soa[_AVG_BODY_SIZE]
+        two_avg_body = 2 * avg_body
+        packed = self.flags
+        bull = _has(packed, _BULLISH)
+        bear = _has(packed, _BEARISH)
+        patterns = {}
         
-        return patterns
-    
-    def _detect_single_candlestick_patterns(self) -> List[str]:
+        # Single candlestick patterns
+        doji = _has(packed, _DOJI)
+        short_upper = us <= ts_tenth
+        short_lower = ls <= ts_tenth
+        dragonfly = doji & short_upper & (ls > two_bs)
+        gravestone = doji & ~dragonfly & short_lower & (us > two_bs)
+        other_doji = doji & ~dragonfly & ~gravestone
+        long_legged = (other_doji & ~(short_upper & short_lower) &
+                       (us > 0.2 * ts) & (ls > 0.2 * ts))
+        patterns['Dragonfly Doji'] = dragonfly
+        patterns['Gravestone Doji'] = gravestone
+        patterns['Doji'] = other_doji & ~long_legged
+        patterns['Long-legged Doji'] = long_legged
+        
+        small_body = bs < avg_body
+        hammer_shape = (ls > two_avg_body) & (us < avg_body) & small_body
+        inverted_shape = (us > two_avg_body) & (ls < avg_body) & small_body
+        patterns['Hammer'] = hammer_shape
+        patterns['Inverted Hammer'] = inverted_shape
+        patterns['Hanging Man'] = hammer_shape & bear
+        patterns['Shooting Star'] = inverted_shape & bear
+        patterns['Spinning Top'] = (us > avg_body) & (ls > avg_body) & small_body
+        
+        marubozu = (bs > two_avg_body) & (us < bs_tenth) & (ls < bs_tenth)
+        patterns['Bullish Marubozu'] = marubozu & bull
+        patterns['Bearish Marubozu'] = marubozu & ~bull
+        
+        # Two-candlestick patterns; the previous candle's flags sit three bits up
+        po, ph, pl, pc, pbs, phalf = (_shift(a, 1) for a in (o, h, l, c, bs, half_bs))
+        pair = (_shift(packed, 1) << 3) | packed
+        bear_bull = _has(pair, _BEARISH << 3 | _BULLISH)
+        bull_bear = _has(pair, _BULLISH << 3 | _BEARISH)
+        bullish_engulfing = bear_bull & (o < pc) & (c > po)
+        bearish_engulfing = bull_bear & (o > pc) & (c < po)
+        bullish_harami = bear_bull & (h < po) & (l > pc)
+        bearish_harami = bull_bear & (h < pc) & (l > po)
+        patterns['Bullish Engulfing'] = bullish_engulfing
+        patterns['Bearish Engulfing'] = bearish_engulfing
+        patterns['Bullish Harami'] = bullish_harami
+        patterns['Bearish Harami'] = bearish_harami
+        patterns['Harami Cross'] = (bullish_harami | bearish_harami) & doji
+        patterns['Piercing Pattern'] = bear_bull & (o < pl) & (c > pc + phalf)
+        patterns['Dark Cloud Cover'] = bull_bear & (o > ph) & (c < pc - phalf)
+        patterns['Tweezer Tops'] = bull_bear & (np.fabs(h - ph) < 0.1 * h)
+        patterns['Tweezer Bottoms'] = bear_bull & (np.fabs(l - pl) < 0.1 * l)
+        
+        # Three-candlestick patterns; the first candle's flags sit six bits up
+        fo, fc, fhalf = (_shift(a, 2) for a in (o, c, half_bs))
+        triple = (_shift(packed, 2).astype(np.uint16) << 6) | pair
+        patterns['Morning Star'] = (_has(triple, _BEARISH << 6 | _BULLISH) &
+                                    (pbs < fhalf) & (c > (fo + fc) / 2))
+        patterns['Evening Star'] = (_has(triple, _BULLISH << 6 | _BEARISH) &
+                                    (pbs < fhalf) & (c < (fo + fc) / 2))
+        patterns['Three White Soldiers'] = (_has(triple, _BULLISH << 6 | _BULLISH << 3 | _BULLISH) &
+                                            (po > fo) & (o > po) & (pc > fc) & (c > pc))
+        patterns['Three Black Crows'] = (_has(triple, _BEARISH << 6 | _BEARISH << 3 | _BEARISH) &
+                                         (po < fo) & (o < po) & (pc < fc) & (c < pc))
+        patterns['Three Inside Up'] = _shift(bullish_harami, 1) & bull & (c > ph)
+        patterns['Three Inside Down'] = _shift(bearish_harami, 1) & bear & (c < pl)
+        patterns['Three Outside Up'] = _shift(bullish_engulfing, 1) & bull & (c > ph)
+        patterns['Three Outside Down'] = _shift(bearish_engulfing, 1) & bear & (c < pl)
+        
+        return pd.DataFrame(patterns, index=index)
+    
+    def _detect_single_candlestick_patterns(self) -> Tuple[str, ...]:
         """Detect single candlestick patterns."""
-        patterns = []
-        
-        if len(self.df) < 1:
-            return patterns
-        
-        current = self.df.iloc[-1]
-        avg_body = self.avg_body_size.iloc[-1]
-        avg_total = self.avg_total_size.iloc[-1]
-        
-        # Doji patterns
-        if self._is_doji(current, avg_total):
-            if self._is_dragonfly_doji(current):
-                patterns.append('Dragonfly Doji')
-            elif self._is_gravestone_doji(current):
-                patterns.append('Gravestone Doji')
-            elif (current['upper_shadow'] <= 0.1 * current['total_size'] and 
-                  current['lower_shadow'] <= 0.1 * current['total_size']):
-                patterns.append('Doji')
-            elif self._is_long_legged_doji(current):
-                patterns.append('Long-legged Doji')
-            else:
-                patterns.append('Doji')
-        
-        # Hammer patterns
-        if self._is_hammer(current, avg_body):
-            patterns.append('Hammer')
+        i = len(self.body) - 1
+        if i < 0:
+            return ()
         
-        if self._is_inverted_hammer(current, avg_body):
-            patterns.append('Inverted Hammer')
+        current = self._row(i)
+        avg_body = float(self.avg_body_size[i])
+        patterns = tuple([name for is_pattern, name in _SINGLE_PATTERNS if is_pattern(current, avg_body)])
         
-        if self._is_hanging_man(current, avg_body):
-            patterns.append('Hanging Man')
-        
-        if self._is_shooting_star(current, avg_body):
-            patterns.append('Shooting Star')
-        
-        if self._is_spinning_top(current, avg_body):
-            patterns.append('Spinning Top')
-        
-        # Marubozu patterns
-        if self._is_marubozu(current, avg_body):
-            if current['is_bullish']:
-                patterns.append('Bullish Marubozu')
-            else:
-                patterns.append('Bearish Marubozu')
-        
-        return patterns
+        # Doji patterns come first
+        doji = _classify_doji(current)
+        return patterns if doji is None else (doji, *patterns)
     
-    def _detect_two_candlestick_patterns(self) -> List[str]:
+    def _detect_two_candlestick_patterns(self) -> Tuple[str, ...]:
         """Detect two-candlestick patterns."""
-        patterns = []
-        
-        if len(self.df) < 2:
-            return patterns
-        
-        current = self.df.iloc[-1]
-        previous = self.df.iloc[-2]
+        i = len(self.body) - 1
+        if i < 1:
+            return ()
         
-        # Engulfing patterns
-        if self._is_bullish_engulfing(current, previous):
-            patterns.append('Bullish Engulfing')
-        
-        if self._is_bearish_engulfing(current, previous):
-            patterns.append('Bearish Engulfing')
-        
-        # Harami patterns
-        if self._is_bullish_harami(current, previous):
-            patterns.append('Bullish Harami')
-        
-        if self._is_bearish_harami(current, previous):
-            patterns.append('Bearish Harami')
-        
-        if self._is_harami_cross(current, previous):
-            patterns.append('Harami Cross')
-        
-        # Piercing and Dark Cloud Cover
-        if self._is_piercing_pattern(current, previous):
-            patterns.append('Piercing Pattern')
-        
-        if self._is_dark_cloud_cover(current, previous):
-            patterns.append('Dark Cloud Cover')
-        
-        # Tweezer patterns
-        if self._is_tweezer_tops(current, previous):
-            patterns.append('Tweezer Tops')
-        
-        if self._is_tweezer_bottoms(current, previous):
-            patterns.append('Tweezer Bottoms')
-        
-        return patterns
+        current = self._row(i)
+        previous = self._row(i - 1)
+        return tuple([name for is_pattern, name in _TWO_PATTERNS if is_pattern(current, previous)])
     
-    def _detect_three_candlestick_patterns(self) -> List[str]:
+    def _detect_three_candlestick_patterns(self) -> Tuple[str, ...]:
         """Detect three-candlestick patterns."""
-        patterns = []
-        
-        if len(self.df) < 3:
-            return patterns
-        
-        first = self.df.iloc[-3]
-        second = self.df.iloc[-2]
-        third = self.df.iloc[-1]
-        
-        # Star patterns
-        if self._is_morning_star(first, second, third):
-            patterns.append('Morning Star')
-        
-        if self._is_evening_star(first, second, third):
-            patterns.append('Evening Star')
-        
-        # Three soldiers and crows
-        if self._is_three_white_soldiers(first, second, third):
-            patterns.append('Three White Soldiers')
-        
-        if self._is_three_black_crows(first, second, third):
-            patterns.append('Three Black Crows')
-        
-        # Three inside patterns
-        if self._is_three_inside_up(first, second, third):
-            patterns.append('Three Inside Up')
-        
-        if self._is_three_inside_down(first, second, third):
-            patterns.append('Three Inside Down')
-        
-        # Three outside patterns
-        if self._is_three_outside_up(first, second, third):
-            patterns.append('Three Outside Up')
-        
-        if self._is_three_outside_down(first, second, third):
-            patterns.append('Three Outside Down')
-        
-        return patterns
-    
-    # Single candlestick pattern detection methods
-    def _is_doji(self, candle: pd.Series, avg_total: float) -> bool:
-        """Check if candle is a doji."""
-        return candle['body_size'] <= 0.1 * candle['total_size']
-    
-    def _is_dragonfly_doji(self, candle: pd.Series) -> bool:
-        """Check if candle is a dragonfly doji."""
-        return (candle['body_size'] <= 0.1 * candle['total_size'] and
-                candle['upper_shadow'] <= 0.1 * candle['total_size'] and
-                candle['lower_shadow'] > 2 * candle['body_size'])
-    
-    def _is_gravestone_doji(self, candle: pd.Series) -> bool:
-        """Check if candle is a gravestone doji."""
-        return (candle['body_size'] <= 0.1 * candle['total_size'] and
-                candle['lower_shadow'] <= 0.1 * candle['total_size'] and
-                candle['upper_shadow'] > 2 * candle['body_size'])
-    
-    def _is_long_legged_doji(self, candle: pd.Series) -> bool:
-        """Check if candle is a long-legged doji."""
-        return (candle['body_size'] <= 0.1 * candle['total_size'] and
-                candle['upper_shadow'] > 0.2 * candle['total_size'] and
-                candle['lower_shadow'] > 0.2 * candle['total_size'])
-    
-    def _is_hammer(self, candle: pd.Series, avg_body: float) -> bool:
-        """Check if candle is a hammer."""
-        return (candle['lower_shadow'] > 2 * avg_body and
-                candle['upper_shadow'] < avg_body and
-                candle['body_size'] < avg_body)
-    
-    def _is_inverted_hammer(self, candle: pd.Series, avg_body: float) -> bool:
-        """Check if candle is an inverted hammer."""
-        return (candle['upper_shadow'] > 2 * avg_body and
-                candle['lower_shadow'] < avg_body and
-                candle['body_size'] < avg_body)
-    
-    def _is_hanging_man(self, candle: pd.Series, avg_body: float) -> bool:
-        """Check if candle is a hanging man."""
-        return (candle['lower_shadow'] > 2 * avg_body and
-                candle['upper_shadow'] < avg_body and
-                candle['body_size'] < avg_body and
-                candle['is_bearish'])
-    
-    def _is_shooting_star(self, candle: pd.Series, avg_body: float) -> bool:
-        """Check if candle is a shooting star."""
-        return (candle['upper_shadow'] > 2 * avg_body and
-                candle['lower_shadow'] < avg_body and
-                candle['body_size'] < avg_body and
-                candle['is_bearish'])
-    
-    def _is_spinning_top(self, candle: pd.Series, avg_body: float) -> bool:
-        """Check if candle is a spinning top."""
-        return (candle['upper_shadow'] > avg_body and
-                candle['lower_shadow'] > avg_body and
-                candle['body_size'] < avg_body)
-    
-    def _is_marubozu(self, candle: pd.Series, avg_body: float) -> bool:
-        """Check if candle is a marubozu."""
-        return (candle['body_size'] > 2 * avg_body and
-                candle['upper_shadow'] < 0.1 * candle['body_size'] and
-                candle['lower_shadow'] < 0.1 * candle['body_size'])
-    
-    # Two-candlestick pattern detection methods
-    def _is_bullish_engulfing(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is bullish engulfing."""
-        return (previous['is_bearish'] and
-                current['is_bullish'] and
-                current['open'] < previous['close'] and
-                current['close'] > previous['open'])
-    
-    def _is_bearish_engulfing(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is bearish engulfing."""
-        return (previous['is_bullish'] and
-                current['is_bearish'] and
-                current['open'] > previous['close'] and
-                current['close'] < previous['open'])
-    
-    def _is_bullish_harami(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is bullish harami."""
-        return (previous['is_bearish'] and
-                current['is_bullish'] and
-                current['high'] < previous['open'] and
-                current['low'] > previous['close'])
-    
-    def _is_bearish_harami(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is bearish harami."""
-        return (previous['is_bullish'] and
-                current['is_bearish'] and
-                current['high'] < previous['close'] and
-                current['low'] > previous['open'])
-    
-    def _is_harami_cross(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is harami cross."""
-        return (self._is_bullish_harami(current, previous) or
-                self._is_bearish_harami(current, previous)) and self._is_doji(current, current['total_size'])
-    
-    def _is_piercing_pattern(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is piercing pattern."""
-        return (previous['is_bearish'] and
-                current['is_bullish'] and
-                current['open'] < previous['low'] and
-                current['close'] > previous['close'] + (previous['body_size'] / 2))
-    
-    def _is_dark_cloud_cover(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is dark cloud cover."""
-        return (previous['is_bullish'] and
-                current['is_bearish'] and
-                current['open'] > previous['high'] and
-                current['close'] < previous['close'] - (previous['body_size'] / 2))
-    
-    def _is_tweezer_tops(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is tweezer tops."""
-        return (abs(current['high'] - previous['high']) < 0.1 * current['high'] and
-                current['is_bearish'] and previous['is_bullish'])
-    
-    def _is_tweezer_bottoms(self, current: pd.Series, previous: pd.Series) -> bool:
-        """Check if pattern is tweezer bottoms."""
-        return (abs(current['low'] - previous['low']) < 0.1 * current['low'] and
-                current['is_bullish'] and previous['is_bearish'])
-    
-    # Three-candlestick pattern detection methods
-    def _is_morning_star(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is morning star."""
-        return (first['is_bearish'] and
-                second['body_size'] < 0.5 * first['body_size'] and
-                third['is_bullish'] and
-                third['close'] > (first['open'] + first['close']) / 2)
-    
-    def _is_evening_star(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is evening star."""
-        return (first['is_bullish'] and
-                second['body_size'] < 0.5 * first['body_size'] and
-                third['is_bearish'] and
-                third['close'] < (first['open'] + first['close']) / 2)
-    
-    def _is_three_white_soldiers(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is three white soldiers."""
-        return (first['is_bullish'] and second['is_bullish'] and third['is_bullish'] and
-                second['open'] > first['open'] and third['open'] > second['open'] and
-                second['close'] > first['close'] and third['close'] > second['close'])
-    
-    def _is_three_black_crows(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is three black crows."""
-        return (first['is_bearish'] and second['is_bearish'] and third['is_bearish'] and
-                second['open'] < first['open'] and third['open'] < second['open'] and
-                second['close'] < first['close'] and third['close'] < second['close'])
-    
-    def _is_three_inside_up(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is three inside up."""
-        return (first['is_bearish'] and
-                self._is_bullish_harami(second, first) and
-                third['is_bullish'] and third['close'] > second['high'])
-    
-    def _is_three_inside_down(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is three inside down."""
-        return (first['is_bullish'] and
-                self._is_bearish_harami(second, first) and
-                third['is_bearish'] and third['close'] < second['low'])
-    
-    def _is_three_outside_up(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is three outside up."""
-        return (first['is_bearish'] and
-                self._is_bullish_engulfing(second, first) and
-                third['is_bullish'] and third['close'] > second['high'])
-    
-    def _is_three_outside_down(self, first: pd.Series, second: pd.Series, third: pd.Series) -> bool:
-        """Check if pattern is three outside down."""
-        return (first['is_bullish'] and
-                self._is_bearish_engulfing(second, first) and
-                third['is_bearish'] and third['close'] < second['low'])
+        i = len(self.body) - 1
+        if i < 2:
+            return ()
+        
+        first = self._row(i - 2)
+        second = self._row(i - 1)
+        third = self._row(i)
+        # Shared by the inside and outside patterns
+        pair = _PairPatterns(
+            _is_bullish_harami(second, first), _is_bearish_harami(second, first),
+            _is_bullish_engulfing(second, first), _is_bearish_engulfing(second, first),
+        )
+        return tuple([name for is_pattern, name in _THREE_PATTERNS if is_pattern(first, second, third, pair)])
 
 
-def detect_candlestick_patterns(df: pd.DataFrame) -> List[str]:
+def detect_candlestick_patterns(df: pd.DataFrame, dtype=np.float32) -> List[str]:
     """
     Convenience function to detect candlestick patterns in a DataFrame.
     
     Args:
         df: DataFrame with OHLC data
+        dtype: Float dtype of the detector's derived arrays
         
     Returns:
         List of detected pattern names
@@ -378,8 +729,104 @@ def detect_candlestick_patterns(df: pd.DataFrame) -> List[str]:
     if df.empty or len(df) < 1:
         return []
     
-    detector = CandlestickPatternDetector(df)
-    return detector.detect_all_patterns()
+    detector = _checkout_detector(df, dtype)
+    patterns = detector.detect_all_patterns()
+    _checkin_detector(detector)
+    return patterns
+
+
+# Detectors from recent calls, keyed by id(df) and least recently used first.
+# Each detector holds its frame, so a cached id can't be reused by another object.
+_DETECTOR_CACHE: 'OrderedDict[Tuple[int, np.dtype], CandlestickPatternDetector]' = OrderedDict()
+_DETECTOR_CACHE_SIZE = 16
+_DETECTOR_CACHE_LOCK = threading.Lock()
+
+
+def _checkout_detector(df: pd.DataFrame, dtype) -> CandlestickPatternDetector:
+    """
+    Return a detector for ``df``, reusing the one from an earlier call on the same frame.
+    
+    A cached detector is removed from the cache while in use, so a concurrent call on
+    the same frame builds its own. Rows appended to the frame since the last call are
+    fed through ``update``; a frame that shrank or whose recent candles changed is rebuilt.
+    """
+    key = (id(df), np.dtype(dtype))
+    with _DETECTOR_CACHE_LOCK:
+        detector = _DETECTOR_CACHE.pop(key, None)
+    if detector is not None and detector.df is df and _extend_detector(detector):
+        return detector
+    return CandlestickPatternDetector(df, dtype)
+
+
+def _checkin_detector(detector: CandlestickPatternDetector):
+    """Return a detector to the cache as the most recently used entry."""
+    key = (id(detector.df), detector.dtype)
+    with _DETECTOR_CACHE_LOCK:
+        _DETECTOR_CACHE[key] = detector
+        _DETECTOR_CACHE.move_to_end(key)
+        if len(_DETECTOR_CACHE) > _DETECTOR_CACHE_SIZE:
+            _DETECTOR_CACHE.popitem(last=False)
+
+
+def _extend_detector(detector: CandlestickPatternDetector) -> bool:
+    """
+    Bring a cached detector up to date with its grown frame; False if it must be rebuilt.
+    
+    The last-candle result only depends on the last _AVG_WINDOW candles, so those are
+    compared against the frame; edits to older rows don't change it.
+    """
+    df = detector.df
+    n, total = len(detector.body), len(df)
+    if total < n or any(col not in df.columns for col in ('open', 'high', 'low', 'close')):
+        return False
+    # Column arrays are views, so only the rows sliced below are copied
+    names = ('open', 'high', 'low', 'close')
+    columns = [df[col].to_numpy() for col in names]
+    start = max(n - _AVG_WINDOW, 0)
+    seen = np.array([values[start:n] for values in columns], dtype=detector.dtype)
+    if not np.array_equal(seen, detector._soa[:_CLOSE + 1, start:n], equal_nan=True):
+        return False
+    for k in range(n, total):
+        detector.update({col: values[k] for col, values in zip(names, columns)})
+    return True
+
+
+# Built once at import; read-only since every caller shares it
+_PATTERN_DESCRIPTIONS = MappingProxyType({
+    # Single candlestick patterns
+    'Doji': 'A doji occurs when the open and close prices are virtually equal, indicating indecision in the market.',
+    'Hammer': 'A bullish reversal pattern with a small body at the top and a long lower shadow.',
+    'Inverted Hammer': 'A bullish reversal pattern with a small body at the bottom and a long upper shadow.',
+    'Hanging Man': 'A bearish reversal pattern that looks like a hammer but appears after an uptrend.',
+    'Shooting Star': 'A bearish reversal pattern with a small body at the bottom and a long upper shadow.',
+    'Spinning Top': 'A pattern indicating indecision with small body and long shadows.',
+    'Bullish Marubozu': 'A strong bullish candle with no shadows.',
+    'Bearish Marubozu': 'A strong bearish candle with no shadows.',
+    'Dragonfly Doji': 'A doji with a long lower shadow and virtually no upper shadow.',
+    'Gravestone Doji': 'A doji with a long upper shadow and virtually no lower shadow.',
+    'Long-legged Doji': 'A doji with long upper and lower shadows.',
+
+    # Two-candlestick patterns
+    'Bullish Engulfing': 'A bullish reversal pattern where the current candle completely engulfs the previous bearish candle.',
+    'Bearish Engulfing': 'A bearish reversal pattern where the current candle completely engulfs the previous bullish candle.',
+    'Bullish Harami': 'A bullish reversal pattern where a small bullish candle is contained within the previous bearish candle.',
+    'Bearish Harami': 'A bearish reversal pattern where a small bearish candle is contained within the previous bullish candle.',
+    'Harami Cross': 'A harami pattern where the second candle is a doji.',
+    'Piercing Pattern': 'A bullish reversal pattern where the current candle opens below the previous low but closes above the midpoint.',
+    'Dark Cloud Cover': 'A bearish reversal pattern where the current candle opens above the previous high but closes below the midpoint.',
+    'Tweezer Tops': 'Two candles with identical highs, indicating resistance.',
+    'Tweezer Bottoms': 'Two candles with identical lows, indicating support.',
+
+    # Three-candlestick patterns
+    'Morning Star': 'A bullish reversal pattern with a bearish candle, a small-bodied candle, and a bullish candle.',
+    'Evening Star': 'A bearish reversal pattern with a bullish candle, a small-bodied candle, and a bearish candle.',
+    'Three White Soldiers': 'Three consecutive bullish candles with higher opens and closes.',
+    'Three Black Crows': 'Three consecutive bearish candles with lower opens and closes.',
+    'Three Inside Up': 'A bullish reversal pattern with a bearish candle, a harami, and a bullish candle.',
+    'Three Inside Down': 'A bearish reversal pattern with a bullish candle, a harami, and a bearish candle.',
+    'Three Outside Up': 'A bullish reversal pattern with a bearish candle, an engulfing, and a bullish candle.',
+    'Three Outside Down': 'A bearish reversal pattern with a bullish candle, an engulfing, and a bearish candle.'
+})
 
 
 def get_pattern_description(pattern_name: str) -> str:
@@ -392,40 +839,4 @@ def get_pattern_description(pattern_name: str) -> str:
     Returns:
         Description of the pattern
     """
-    descriptions = {
-        # Single candlestick patterns
-        'Doji': 'A doji occurs when the open and close prices are virtually equal, indicating indecision in the market.',
-        'Hammer': 'A bullish reversal pattern with a small body at the top and a long lower shadow.',
-        'Inverted Hammer': 'A bullish reversal pattern with a small body at the bottom and a long upper shadow.',
-        'Hanging Man': 'A bearish reversal pattern that looks like a hammer but appears after an uptrend.',
-        'Shooting Star': 'A bearish reversal pattern with a small body at the bottom and a long upper shadow.',
-        'Spinning Top': 'A pattern indicating indecision with small body and long shadows.',
-        'Bullish Marubozu': 'A strong bullish candle with no shadows.',
-        'Bearish Marubozu': 'A strong bearish candle with no shadows.',
-        'Dragonfly Doji': 'A doji with a long lower shadow and virtually no upper shadow.',
-        'Gravestone Doji': 'A doji with a long upper shadow and virtually no lower shadow.',
-        'Long-legged Doji': 'A doji with long upper and lower shadows.',
-        
-        # Two-candlestick patterns
-        'Bullish Engulfing': 'A bullish reversal pattern where the current candle completely engulfs the previous bearish candle.',
-        'Bearish Engulfing': 'A bearish reversal pattern where the current candle completely engulfs the previous bullish candle.',
-        'Bullish Harami': 'A bullish reversal pattern where a small bullish candle is contained within the previous bearish candle.',
-        'Bearish Harami': 'A bearish reversal pattern where a small bearish candle is contained within the previous bullish candle.',
-        'Harami Cross': 'A harami pattern where the second candle is a doji.',
-        'Piercing Pattern': 'A bullish reversal pattern where the current candle opens below the previous low but closes above the midpoint.',
-        'Dark Cloud Cover': 'A bearish reversal pattern where the current candle opens above the previous high but closes below the midpoint.',
-        'Tweezer Tops': 'Two candles with identical highs, indicating resistance.',
-        'Tweezer Bottoms': 'Two candles with identical lows, indicating support.',
-        
-        # Three-candlestick patterns
-        'Morning Star': 'A bullish reversal pattern with a bearish candle, a small-bodied candle, and a bullish candle.',
-        'Evening Star': 'A bearish reversal pattern with a bullish candle, a small-bodied candle, and a bearish candle.',
-        'Three White Soldiers': 'Three consecutive bullish candles with higher opens and closes.',
-        'Three Black Crows': 'Three consecutive bearish candles with lower opens and closes.',
-        'Three Inside Up': 'A bullish reversal pattern with a bearish candle, a harami, and a bullish candle.',
-        'Three Inside Down': 'A bearish reversal pattern with a bullish candle, a harami, and a bearish candle.',
-        'Three Outside Up': 'A bullish reversal pattern with a bearish candle, an engulfing, and a bullish candle.',
-        'Three Outside Down': 'A bearish reversal pattern with a bullish candle, an engulfing, and a bearish candle.'
-    }
-    
-    return descriptions.get(pattern_name, 'Pattern description not available.') 
\ No newline at end of file
+    return _PATTERN_DESCRIPTIONS.get(pattern_name, 'Pattern description not available.')
\ No newline at end of file
@@ -0,0 +1,186 @@
+import pandas as pd
+import numpy as np
+import unittest
+from unittest import mock
+from collections import namedtuple
+import advanced_analysis
+from advanced_analysis import (
+    analyze_all_tokens_custom, analyze_stock_custom, get_cached_historical_data, get_historical_data
+)
+
+Instrument = namedtuple('Instrument', ['exchange', 'token', 'symbol'])
+
+class FakeAlice:
+    """Stand-in for the AliceBlue client serving fixed daily histories per token."""
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.calls = 0
+
+    def get_instrument_by_token(self, exchange, token):
+        return Instrument(exchange, token, f'STOCK{token}')
+
+    def get_historical(self, instrument, from_date, to_date, interval):
+        self.calls += 1
+        close = self.histories[instrument.token]
+        volume = np.arange(len(close)) % 7 * 100 + 1000
+        dates = pd.date_range(end='2024-06-28', periods=len(close), freq='B')
+        return [
+            {'open': c, 'high': c * 1.01, 'low': c * 0.99, 'close': c, 'volume': v, 'datetime': str(d)}
+            for c, v, d in zip(close, volume, dates)
+        ]
+
+def expected_custom(symbol, close, volume, duration_days, target_percentage, direction):
+    """Per-stock custom screen result, computed with scalar formulas."""
+    if len(close) < duration_days:
+        return None
+    percentage_change = (close[-1] - close[-duration_days]) / close[-duration_days] * 100
+    met = percentage_change >= target_percentage if direction == 'up' else percentage_change <= -target_percentage
+    if not met:
+        return None
+    returns = np.diff(close) / close[:-1]
+    return {
+        'Name': symbol,
+        'Close': close[-1],
+        'Start_Price': close[-duration_days],
+        'Percentage_Change': percentage_change,
+        'Volume_Trend': 'Increasing' if volume[-5:].mean() > volume[-20:].mean() else 'Decreasing',
+        'Volatility': returns.std(ddof=1) * 100,
+        'Duration_Days': duration_days,
+        'Direction': direction.capitalize(),
+        'Strength': abs(percentage_change) / target_percentage
+    }
+
+class TestCustomScreen(unittest.TestCase):
+    """Test the stacked-matrix custom screen against per-stock formulas."""
+
+    def setUp(self):
+        """Set up histories of mixed lengths and directions."""
+        advanced_analysis.clear_cache()
+        rng = np.random.default_rng(1)
+        self.histories = {
+            1: 100 * np.cumprod(1 + rng.normal(0.004, 0.01, 300)),   # long, rising
+            2: 50 * np.cumprod(1 + rng.normal(0.006, 0.01, 40)),     # short, rising
+            3: 80 * np.cumprod(1 + rng.normal(-0.01, 0.005, 120)),   # falling
+            4: 20 * np.cumprod(1 + rng.normal(0.02, 0.01, 10)),      # shorter than duration_days
+            5: 60 + rng.normal(0, 0.01, 200),                       # flat
+        }
+        self.alice = FakeAlice(self.histories)
+
+    def expected(self, duration_days, target_percentage, direction):
+        results = []
+        for token, close in self.histories.items():
+            close = close.astype(np.float32)
+            volume = self.alice.get_historical(Instrument('NSE', token, None), None, None, 'D')
+            volume = np.array([r['volume'] for r in volume], dtype=np.float64)
+            result = expected_custom(f'STOCK{token}', close, volume, duration_days, target_percentage, direction)
+            if result:
+                results.append(result)
+        return results
+
+    def assertResultsEqual(self, results, expected):
+        self.assertEqual([r['Name'] for r in results], [r['Name'] for r in expected])
+        for result, exp in zip(results, expected):
+            for key, value in exp.items():
+                if isinstance(value, (str, int)):
+                    self.assertEqual(result[key], value, key)
+                else:
+                    np.testing.assert_allclose(result[key], value, rtol=1e-5, err_msg=key)
+
+    def test_screen_matches_per_stock_formulas(self):
+        """Test both directions over histories of mixed length."""
+        tokens = list(self.histories)
+        for direction, names in (('up', ['STOCK1', 'STOCK2']), ('down', ['STOCK3'])):
+            expected = self.expected(20, 5, direction)
+            self.assertEqual([r['Name'] for r in expected], names)
+            self.assertResultsEqual(analyze_all_tokens_custom(self.alice, tokens, 20, 5, direction), expected)
+
+            single = [analyze_stock_custom(self.alice, token, 20, 5, direction) for token in tokens]
+            self.assertResultsEqual([r for r in single if r], expected)
+
+    def test_stock_shorter_than_duration(self):
+        """Test that a stock without duration_days of history is never reported."""
+        self.assertIsNone(analyze_stock_custom(self.alice, 4, 20, 5, 'up'))
+        self.assertEqual(analyze_all_tokens_custom(self.alice, [4], 20, 5, 'up'), [])
+
+class FrameAlice(FakeAlice):
+    """FakeAlice returning a DataFrame, as pya3 does."""
+
+    def get_historical(self, instrument, from_date, to_date, interval):
+        return pd.DataFrame(super().get_historical(instrument, from_date, to_date, interval))
+
+class TestHistoricalData(unittest.TestCase):
+    """Test parsing of get_historical responses."""
+
+    def test_dataframe_response(self):
+        """Test that a DataFrame response is typed per SCHEMA with incomplete rows dropped."""
+        alice = FrameAlice({1: np.linspace(100, 104, 5)})
+        frame = alice.get_historical(Instrument('NSE', 1, None), None, None, 'D')
+        frame.loc[1, 'high'] = np.nan
+        frame.loc[3, 'volume'] = np.nan
+        alice.get_historical = lambda *args: frame
+
+        instrument, cols = get_historical_data(alice, 1, None, None)
+        self.assertEqual(instrument.symbol, 'STOCK1')
+        self.assertEqual({k: arr.dtype for k, arr in cols.items()},
+                         {k: np.dtype(dtype) for k, dtype in advanced_analysis.SCHEMA.items()})
+        np.testing.assert_allclose(cols['close'], [100, 102, 104])
+        np.testing.assert_array_equal(cols['volume'], frame['volume'].iloc[[0, 2, 4]].astype(np.int64))
+        np.testing.assert_array_equal(cols['datetime'], pd.to_datetime(frame['datetime'].iloc[[0, 2, 4]]).to_numpy('M8[s]'))
+        for arr in cols.values():
+            self.assertTrue(arr.flags.c_contiguous)
+
+class TestHistoryCache(unittest.TestCase):
+    """Test reuse and expiry of cached historical fetches."""
+
+    def setUp(self):
+        """Set up histories and an empty cache."""
+        advanced_analysis.clear_cache()
+        self.histories = {1: np.linspace(100, 120, 50), 2: np.linspace(50, 40, 50), 3: np.array([])}
+
+    def test_cache_is_shared_between_clients(self):
+        """Test that a new client reuses the fetch of an earlier one."""
+        first, second = FakeAlice(self.histories), FakeAlice(self.histories)
+        _, cols = get_cached_historical_data(first, 1, 365)
+        _, cached = get_cached_historical_data(second, 1, 365)
+        self.assertEqual((first.calls, second.calls), (1, 0))
+        self.assertIs(cached, cols)
+        self.assertFalse(cols['close'].flags.writeable)
+
+        get_cached_historical_data(second, 1, 365, exchange='BSE')
+        get_cached_historical_data(second, 1, 30)
+        self.assertEqual(second.calls, 2)
+
+    def test_entries_expire_after_ttl(self):
+        """Test that a fetch older than HISTORY_CACHE_TTL is repeated."""
+        alice = FakeAlice(self.histories)
+        with mock.patch('advanced_analysis.monotonic', return_value=1000.0):
+            get_cached_historical_data(alice, 1, 365)
+        with mock.patch('advanced_analysis.monotonic', return_value=1000.0 + advanced_analysis.HISTORY_CACHE_TTL - 1):
+            get_cached_historical_data(alice, 1, 365)
+        self.assertEqual(alice.calls, 1)
+        with mock.patch('advanced_analysis.monotonic', return_value=1000.0 + advanced_analysis.HISTORY_CACHE_TTL):
+            get_cached_historical_data(alice, 1, 365)
+        self.assertEqual(alice.calls, 2)
+
+    def test_empty_response_is_not_cached(self):
+        """Test that an empty response is fetched again on the next call."""
+        alice = FakeAlice(self.histories)
+        for _ in range(2):
+            _, cols = get_cached_historical_data(alice, 3, 365)
+            self.assertEqual(len(cols['close']), 0)
+        self.assertEqual(alice.calls, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache drops its least recently used fetch when full."""
+        alice = FakeAlice(self.histories)
+        with mock.patch('advanced_analysis.HISTORY_CACHE_SIZE', 1):
+            get_cached_historical_data(alice, 1, 365)
+            get_cached_historical_data(alice, 2, 365)
+            get_cached_historical_data(alice, 2, 365)
+            self.assertEqual(alice.calls, 2)
+            get_cached_historical_data(alice, 1, 365)
+            self.assertEqual(alice.calls, 3)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 import unittest
+from unittest import mock
+import candlestick_patterns
 from candlestick_patterns import CandlestickPatternDetector, detect_candlestick_patterns, get_pattern_description
 
 class TestCandlestickPatterns(unittest.TestCase):
@@ -147,11 +149,14 @@ class TestCandlestickPatterns(unittest.TestCase):
         """Test CandlestickPatternDetector initialization."""
         detector = CandlestickPatternDetector(self.sample_data)
         
-        # Check that required columns are added
-        required_cols = ['body', 'body_size', 'upper_shadow', 'lower_shadow', 
-                        'total_size', 'is_bullish', 'is_bearish']
-        for col in required_cols:
-            self.assertIn(col, detector.df.columns)
+        # Check that derived arrays are computed
+        required_attrs = ['body', 'body_size', 'upper_shadow', 'lower_shadow', 
+                          'total_size', 'is_bullish', 'is_bearish']
+        for attr in required_attrs:
+            self.assertIsInstance(getattr(detector, attr), np.ndarray)
+            self.assertEqual(len(getattr(detector, attr)), len(self.sample_data))
+        self.assertEqual(detector.body_size.dtype, np.float32)
+        self.assertEqual(CandlestickPatternDetector(self.sample_data, np.float64).body_size.dtype, np.float64)
     
     def test_invalid_dataframe(self):
         """Test pattern detection with invalid DataFrame."""
@@ -159,28 +164,139 @@ class TestCandlestickPatterns(unittest.TestCase):
         
         with self.assertRaises(ValueError):
             CandlestickPatternDetector(invalid_df)
+    
+    def random_frames(self):
+        """Return a random-walk frame and one with prices on a 0.05 tick grid."""
+        rng = np.random.default_rng(0)
+        base = 100 + np.cumsum(rng.normal(0, 2, 60))
+        open_ = base + rng.normal(0, 1, 60)
+        close = base + rng.normal(0, 1, 60)
+        df = pd.DataFrame({
+            'open': open_,
+            'high': np.maximum(open_, close) + rng.exponential(1, 60),
+            'low': np.minimum(open_, close) - rng.exponential(1, 60),
+            'close': close,
+            'volume': rng.integers(1000, 2000, 60)
+        })
+        
+        # Tick-grid prices land exactly on midpoint thresholds
+        rng = np.random.default_rng(19)
+        close = 100 + np.cumsum(rng.integers(-20, 21, 120)) * 0.05
+        open_ = close + rng.integers(-10, 11, 120) * 0.05
+        ticks = pd.DataFrame({
+            'open': open_,
+            'high': np.maximum(open_, close) + rng.integers(0, 8, 120) * 0.05,
+            'low': np.minimum(open_, close) - rng.integers(0, 8, 120) * 0.05,
+            'close': close,
+            'volume': 1000
+        })
+        return df, ticks
+    
+    def test_vectorized_matches_last_row(self):
+        """Test that vectorized detection agrees with last-row detection for every prefix."""
+        for data in (self.sample_data, *self.random_frames()):
+            flags = CandlestickPatternDetector(data).detect_all_patterns_vectorized()
+            self.assertEqual(len(flags), len(data))
+            for i in range(len(data)):
+                expected = detect_candlestick_patterns(data.iloc[:i + 1])
+                detected = [name for name in flags.columns if flags[name].iloc[i]]
+                self.assertEqual(detected, expected)
+    
+    @unittest.skipUnless(candlestick_patterns.NUMBA_AVAILABLE, 'numba is not installed')
+    def test_kernel_matches_python_predicates(self):
+        """Test the compiled kernel against the NumPy fallback and the Python predicates."""
+        for dtype in (np.float32, np.float64):
+            for data in (self.sample_data, *self.random_frames()):
+                detector = CandlestickPatternDetector(data, dtype)
+                found = candlestick_patterns._detect_rows_kernel(detector._soa, detector.flags, len(data))
+                with mock.patch.object(candlestick_patterns, 'NUMBA_AVAILABLE', False):
+                    fallback = detector.detect_all_patterns_vectorized()
+                np.testing.assert_array_equal(found, fallback.to_numpy())
+                
+                for i in range(len(data)):
+                    prefix = CandlestickPatternDetector(data.iloc[:i + 1], dtype)
+                    expected = [*prefix._detect_single_candlestick_patterns(),
+                                *prefix._detect_two_candlestick_patterns(),
+                                *prefix._detect_three_candlestick_patterns()]
+                    detected = [name for name, hit in zip(fallback.columns, found[i]) if hit]
+                    self.assertEqual(detected, expected)
+    
+    def test_update_matches_rebuild(self):
+        """Test that appending rows with update() matches a detector built on the full frame."""
+        detector = CandlestickPatternDetector(self.sample_data.iloc[:3])
+        for i in range(3, len(self.sample_data)):
+            detector.update(self.sample_data.iloc[i].to_dict())
+            expected = detect_candlestick_patterns(self.sample_data.iloc[:i + 1])
+            self.assertEqual(detector.detect_all_patterns(), expected)
+        
+        rebuilt = CandlestickPatternDetector(self.sample_data)
+        np.testing.assert_allclose(detector.avg_body_size, rebuilt.avg_body_size)
+        np.testing.assert_allclose(detector.avg_total_size, rebuilt.avg_total_size)
+        
+        with self.assertRaises(ValueError):
+            detector.update({'open': 100})
+    
+    def test_repeated_detection_on_growing_frame(self):
+        """Test that re-detecting on a frame grown in place matches a fresh detector."""
+        df = self.sample_data.iloc[:3].copy()
+        self.assertEqual(detect_candlestick_patterns(df), detect_candlestick_patterns(df))
+        for i in range(3, len(self.sample_data)):
+            df.loc[i] = self.sample_data.iloc[i]
+            expected = CandlestickPatternDetector(df.copy()).detect_all_patterns()
+            self.assertEqual(detect_candlestick_patterns(df), expected)
+        
+        df.loc[len(df) - 1, 'close'] = 90
+        self.assertEqual(detect_candlestick_patterns(df),
+                         CandlestickPatternDetector(df.copy()).detect_all_patterns())
+    
+    def test_repeated_detection_after_editing_earlier_row(self):
+        """Test that editing a row before the last one in place isn't served from the cache."""
+        df = self.sample_data.copy()
+        self.assertEqual(detect_candlestick_patterns(df), ['Three White Soldiers'])
+        df.loc[8, ['open', 'high', 'low', 'close']] = [124, 126, 119, 121]
+        self.assertEqual(detect_candlestick_patterns(df), ['Tweezer Bottoms'])
+    
+    def test_repeated_detection_cost_is_independent_of_length(self):
+        """Test that re-detecting on a cached frame doesn't scale with its length."""
+        import time
+        
+        def best_hit_time(n_rows):
+            close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, n_rows))
+            df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close + 0.3})
+            detect_candlestick_patterns(df)
+            timings = []
+            for _ in range(20):
+                start = time.perf_counter()
+                detect_candlestick_patterns(df)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+        
+        short, long = best_hit_time(1000), best_hit_time(500000)
+        self.assertLess(long, 5 * short + 1e-4)
 
 def run_performance_test():
     """Run performance test with large dataset."""
     print("Running performance test...")
     
-    # Create large dataset
+    # Create large dataset; high and low bound the open and close of each row
     n_rows = 10000
+    base = np.random.uniform(100, 200, (n_rows, 1))
+    ohlc = base + np.random.uniform(-5, 5, (n_rows, 4))
     large_df = pd.DataFrame({
-        'open': np.random.uniform(100, 200, n_rows),
-        'high': np.random.uniform(110, 220, n_rows),
-        'low': np.random.uniform(90, 180, n_rows),
-        'close': np.random.uniform(100, 200, n_rows),
+        'open': ohlc[:, 0],
+        'high': ohlc.max(axis=1),
+        'low': ohlc.min(axis=1),
+        'close': ohlc[:, 3],
         'volume': np.random.uniform(1000, 10000, n_rows)
     })
     
     import time
     start_time = time.time()
-    patterns = detect_candlestick_patterns(large_df)
+    patterns = CandlestickPatternDetector(large_df).detect_all_patterns_vectorized()
     end_time = time.time()
     
     print(f"Processed {n_rows} rows in {end_time - start_time:.2f} seconds")
-    print(f"Detected {len(patterns)} patterns")
+    print(f"Detected {int(patterns.to_numpy().sum())} patterns")
     
     return end_time - start_time
 